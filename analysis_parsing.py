@@ -0,0 +1,100 @@
+import re
+import json
+
+BEST_FIT_THRESHOLD = 7.0
+
+# Labelled score such as "Score: 7.5/10", "**Rating:** 8 out of 10".
+# Written in the subset shared by Python re and PostgreSQL regular expressions,
+# so the same pattern drives both the Python fallback and the SQL score backfill.
+SCORE_PATTERN = r"(?i)(?:score|rating)[:\s*]*(\d{1,2}(?:\.\d+)?)\s*(?:/|out of)\s*10"
+SCORE_REGEX = re.compile(SCORE_PATTERN)
+
+# Fields requested from the model in the structured analysis response
+ANALYSIS_FIELDS = ("score", "strengths", "gaps", "recommendation")
+
+
+def extract_score(text):
+    """Extract a labelled 0-10 score from free-form analysis text.
+
+    Returns:
+        float: The score, or None if no valid labelled score is present
+    """
+    if not text:
+        return None
+    for match in SCORE_REGEX.finditer(text):
+        score = float(match.group(1))
+        if 0 <= score <= 10:
+            return score
+    return None
+
+
+def parse_structured_analysis(content):
+    """Parse a JSON analysis response.
+
+    Returns:
+        dict: The analysis with score, strengths, gaps and recommendation,
+              or None if the content is not a valid structured analysis
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    try:
+        score = round(float(data.get("score")), 1)
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= score <= 10:
+        return None
+
+    def as_list(value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(item) for item in value]
+
+    return {
+        "score": score,
+        "strengths": as_list(data.get("strengths")),
+        "gaps": as_list(data.get("gaps")),
+        "recommendation": str(data.get("recommendation") or "")
+    }
+
+
+def render_analysis(analysis):
+    """Render a structured analysis as the readable text stored in gpt_analysis."""
+    lines = [f"Score: {analysis['score']:.1f}/10", "", "Key Strengths:"]
+    lines += [f"- {item}" for item in analysis["strengths"]] or ["- None identified"]
+    lines += ["", "Gaps:"]
+    lines += [f"- {item}" for item in analysis["gaps"]] or ["- None identified"]
+    lines += ["", "Overall Assessment and Recommendations:", analysis["recommendation"]]
+    return "\n".join(lines)
+
+
+def parse_analysis_response(content):
+    """Turn a model response into the stored analysis text, score and best-fit flag.
+
+    Structured JSON responses are parsed directly; anything else falls back to
+    extracting a labelled score from the text.
+
+    Returns:
+        dict: {'analysis': str, 'score': float, 'is_best_fit': bool}
+    """
+    structured = parse_structured_analysis(content)
+    if structured is not None:
+        analysis_text = render_analysis(structured)
+        score = structured["score"]
+    else:
+        analysis_text = content or ""
+        score = extract_score(analysis_text)
+        # Unscored analyses are stored with 0 so they sort last and are not re-parsed
+        score = 0 if score is None else score
+
+    return {
+        "analysis": analysis_text,
+        "score": score,
+        "is_best_fit": score >= BEST_FIT_THRESHOLD
+    }
@@ -1,24 +1,56 @@
 import os
 import json
-from apify_client import ApifyClient
 from dotenv import load_dotenv
 from datetime import datetime
 import time
 
 load_dotenv()
 
+# Run statuses after which no more items are written to the dataset
+RUN_FAILED_STATUSES = ['FAILED', 'ABORTED', 'TIMED-OUT']
+RUN_FINAL_STATUSES = ['SUCCEEDED'] + RUN_FAILED_STATUSES
+
+DEFAULT_TASK_ID = "BU6xftpc3qHM9y7if"  # Your task ID
+
+def load_task_configs():
+    """
+    Load the Apify tasks to scrape.
+    APIFY_TASKS_FILE points to a JSON list of {"task_id": ..., "input": {...}} entries;
+    APIFY_TASKS is a comma-separated list of task IDs. Defaults to the single default task.
+    """
+    tasks_file = os.getenv('APIFY_TASKS_FILE')
+    if tasks_file:
+        with open(tasks_file, 'r') as f:
+            return [{'task_id': task['task_id'], 'input': task.get('input')} for task in json.load(f)]
+    task_ids = [task_id.strip() for task_id in os.getenv('APIFY_TASKS', '').split(',') if task_id.strip()]
+    return [{'task_id': task_id, 'input': None} for task_id in task_ids or [DEFAULT_TASK_ID]]
+
 class ApifyWrapper:
     def __init__(self):
+        # Imported here so modules that only reference ApifyWrapper start quickly
+        from apify_client import ApifyClient
+        
         self.api_token = os.getenv('APIFY_API_TOKEN')
-        self.client = ApifyClient(self.api_token)
-        self.task_id = "BU6xftpc3qHM9y7if"  # Your task ID
+        # APIFY_API_URL points the client at another API server (e.g. fake_apify_server.py)
+        self.client = ApifyClient(self.api_token, api_url=os.getenv('APIFY_API_URL') or None)
+        self.tasks = load_task_configs()
+        self.task_id = self.tasks[0]['task_id']
         self.last_run_id = None
+        
+        # Run tracking: server-side long polling instead of fixed sleeps
+        self.max_wait_time = float(os.getenv('APIFY_MAX_WAIT', 3600))
+        self.wait_secs = int(os.getenv('APIFY_WAIT_SECS', 60))
+        self.poll_secs = int(os.getenv('APIFY_POLL_SECS', 10))
+        # Stream dataset items while the run is still in progress
+        self.stream_items = os.getenv('APIFY_STREAM_ITEMS', 'true').lower() == 'true'
 
-    def trigger_job_scraping(self):
-        """Run the Apify actor task and return the run information"""
+    def trigger_job_scraping(self, task_input=None, task_id=None):
+        """Start the Apify actor task without waiting for it and return the run information"""
+        task_id = task_id or self.task_id
         try:
-            print("Starting Apify task...")
-            run_info = self.client.task(self.task_id).call()
+            print(f"Starting Apify task {task_id}...")
+            # task_input overrides fields of the task's saved input for this run only
+            run_info = self.client.task(task_id).start(task_input=task_input)
             
             # Create a serializable version of the run info
             safe_run_info = {
@@ -38,70 +70,127 @@ class ApifyWrapper:
             print(f"Error triggering job scraping: {str(e)}")
             return None
     
-    def wait_for_run_completion(self, run_id, max_wait_time=300, check_interval=10):
-        """Wait for an Apify run to complete with timeout"""
+    def wait_for_run_completion(self, run_id, max_wait_time=None):
+        """Wait for an Apify run to finish, long-polling the API with waitForFinish"""
         print(f"Waiting for run {run_id} to complete...")
+        max_wait_time = self.max_wait_time if max_wait_time is None else max_wait_time
         
-        start_time = time.time()
-        while time.time() - start_time < max_wait_time:
+        deadline = time.time() + max_wait_time
+        error_delay = 1
+        while time.time() < deadline:
             try:
-                run_info = self.client.run(run_id).get()
-                status = run_info.get('status')
+                # Returns as soon as the run finishes, or after wait_secs with the current status
+                wait_secs = max(1, min(self.wait_secs, int(deadline - time.time())))
+                run_info = self.client.run(run_id).wait_for_finish(wait_secs=wait_secs)
+                status = run_info.get('status') if run_info else None
                 
                 if status == 'SUCCEEDED':
                     print(f"Run {run_id} completed successfully")
                     return run_info
-                elif status in ['FAILED', 'ABORTED', 'TIMED-OUT']:
+                elif status in RUN_FAILED_STATUSES:
                     print(f"Run {run_id} failed with status: {status}")
                     return None
                 
-                print(f"Run status: {status}. Waiting {check_interval} seconds...")
-                time.sleep(check_interval)
+                print(f"Run status: {status}. Still waiting...")
+                error_delay = 1
             except Exception as e:
-                print(f"Error checking run status: {str(e)}")
-                time.sleep(check_interval)
+                # Back off exponentially on API errors instead of hammering the endpoint
+                print(f"Error checking run status: {str(e)}. Retrying in {error_delay} seconds...")
+                time.sleep(error_delay)
+                error_delay = min(error_delay * 2, 60)
         
         print(f"Timeout waiting for run {run_id} to complete")
         return None
 
-    def get_job_data(self):
-        """Trigger scraping job and fetch the data when complete"""
-        try:
-            # Start the task
-            run = self.trigger_job_scraping()
-            if not run:
-                return None
-
-            # Wait for the run to complete
-            run_id = run['id']
-            completed_run = self.wait_for_run_completion(run_id)
-            
-            if not completed_run:
-                print("Run did not complete successfully")
-                return None
-
-            # Get the dataset ID from the completed run
-            dataset_id = completed_run.get("defaultDatasetId")
-            if not dataset_id:
-                print("No dataset ID found in the run information")
-                return None
+    def iter_run_pages(self, run_id, dataset_id, page_size=500):
+        """Yield dataset items in pages of page_size while the run is still writing them
+        (the last page, yielded once the run has finished, may be smaller)"""
+        dataset = self.client.dataset(dataset_id)
+        run_client = self.client.run(run_id)
+        deadline = time.time() + self.max_wait_time
+        offset = 0
+        buffer = []
+        finished = False
+        while True:
+            page = dataset.list_items(offset=offset, limit=page_size - len(buffer))
+            if page.items:
+                print(f"Fetched items {offset + 1}-{offset + len(page.items)} from dataset {dataset_id}")
+                buffer.extend(item for item in page.items if isinstance(item, dict))
+                offset += len(page.items)
+                # Buffer the small pages a running actor produces, so each yielded page costs one write
+                if len(buffer) >= page_size:
+                    yield buffer
+                    buffer = []
+                continue
             
-            # Fetch and process the job data
-            print(f"Fetching job data from dataset {dataset_id}...")
-            jobs = []
+            # All items written so far are consumed; stop once the run has finished and been drained
+            if finished:
+                if buffer:
+                    yield buffer
+                return
+            if time.time() > deadline:
+                raise RuntimeError(f"Timeout waiting for run {run_id} to complete")
             
-            try:
-                for item in self.client.dataset(dataset_id).iterate_items():
-                    # Make sure each job item is JSON serializable
-                    if isinstance(item, dict):
-                        jobs.append(item)
-                
-                print(f"Retrieved {len(jobs)} jobs")
-                return jobs
-            except Exception as e:
-                print(f"Error iterating dataset items: {str(e)}")
-                return None
-                
+            # Long-poll the run; this returns early as soon as the run finishes
+            run_info = run_client.wait_for_finish(wait_secs=self.poll_secs)
+            status = run_info.get('status') if run_info else None
+            if status in RUN_FINAL_STATUSES:
+                if status != 'SUCCEEDED':
+                    # Yield the items written before the failure, then report it to the caller
+                    if buffer:
+                        yield buffer
+                    raise RuntimeError(f"Run {run_id} failed with status: {status}")
+                finished = True
+
+    def iter_dataset_pages(self, dataset_id, page_size=500):
+        """Yield the items of a dataset one page at a time"""
+        dataset = self.client.dataset(dataset_id)
+        offset = 0
+        while True:
+            page = dataset.list_items(offset=offset, limit=page_size)
+            items = [item for item in page.items if isinstance(item, dict)]
+            if not page.items:
+                return
+            print(f"Fetched items {offset + 1}-{offset + len(page.items)} of {page.total} from dataset {dataset_id}")
+            yield items
+            offset += len(page.items)
+            if page.total is not None and offset >= page.total:
+                return
+
+    def iter_task_pages(self, task_id, page_size=500, task_input=None):
+        """Run one task and yield its job items page by page, raising if the run fails"""
+        run = self.trigger_job_scraping(task_input, task_id)
+        if not run:
+            raise RuntimeError(f"Could not start task {task_id}")
+
+        # Stream items as the actor produces them
+        if self.stream_items and run.get('defaultDatasetId'):
+            print(f"Streaming job data from dataset {run['defaultDatasetId']}...")
+            yield from self.iter_run_pages(run['id'], run['defaultDatasetId'], page_size)
+            return
+
+        # Otherwise wait for the run to complete
+        completed_run = self.wait_for_run_completion(run['id'])
+        if not completed_run:
+            raise RuntimeError(f"Run {run['id']} did not complete successfully")
+
+        # Get the dataset ID from the completed run
+        dataset_id = completed_run.get("defaultDatasetId")
+        if not dataset_id:
+            raise RuntimeError("No dataset ID found in the run information")
+
+        print(f"Fetching job data from dataset {dataset_id}...")
+        yield from self.iter_dataset_pages(dataset_id, page_size)
+
+    def iter_job_pages(self, page_size=500, task_input=None):
+        """Trigger the scraping task and yield its job items page by page"""
+        try:
+            yield from self.iter_task_pages(self.task_id, page_size, task_input)
         except Exception as e:
-            print(f"Error in get_job_data: {str(e)}")
-            return None 
\ No newline at end of file
+            print(f"Error in iter_job_pages: {str(e)}")
+
+    def get_job_data(self):
+        """Trigger scraping job and fetch all job items as a list"""
+        jobs = [item for page in self.iter_job_pages() for item in page]
+        print(f"Retrieved {len(jobs)} jobs")
+        return jobs or None
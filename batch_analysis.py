@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import uuid
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIBatchClient:
+    """Batch client backed by the OpenAI Batch API."""
+
+    def __init__(self, openai_client):
+        self.client = openai_client
+
+    def upload(self, path):
+        """Upload a JSONL request file and return its file ID."""
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create(self, input_file_id, metadata=None):
+        """Create a batch for an uploaded request file and return the batch ID."""
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+            metadata=metadata
+        )
+        return batch.id
+
+    def retrieve(self, batch_id):
+        """Return the batch status as a dictionary."""
+        batch = self.client.batches.retrieve(batch_id)
+        return {
+            "id": batch.id,
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id
+        }
+
+    def download(self, file_id):
+        """Return the text content of a batch output or error file."""
+        return self.client.files.content(file_id).text
+
+
+class FakeBatchClient:
+    """In-memory stand-in for the Batch API, for tests and dry runs.
+
+    Each request body is answered by calling responder(body), which returns the
+    assistant message content (or raises to simulate a failed request).
+    """
+
+    def __init__(self, responder, polls_until_complete=0):
+        """
+        Args:
+            responder: Callable taking a chat completion request body and returning the reply text
+            polls_until_complete: Number of retrieve() calls that report "in_progress" before completion
+        """
+        self.responder = responder
+        self.polls_until_complete = polls_until_complete
+        self.files = {}
+        self.batches = {}
+
+    def upload(self, path):
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with open(path, "r") as f:
+            self.files[file_id] = f.read()
+        return file_id
+
+    def create(self, input_file_id, metadata=None):
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        output_lines, error_lines = [], []
+        for line in self.files[input_file_id].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                content = self.responder(request["body"])
+                output_lines.append(json.dumps({
+                    "id": f"resp-{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}
+                    },
+                    "error": None
+                }))
+            except Exception as e:
+                error_lines.append(json.dumps({
+                    "id": f"resp-{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": None,
+                    "error": {"code": "fake_error", "message": str(e)}
+                }))
+
+        output_file_id = self._store("\n".join(output_lines)) if output_lines else None
+        error_file_id = self._store("\n".join(error_lines)) if error_lines else None
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "status": "in_progress",
+            "output_file_id": output_file_id,
+            "error_file_id": error_file_id,
+            "polls_left": self.polls_until_complete
+        }
+        return batch_id
+
+    def retrieve(self, batch_id):
+        batch = self.batches[batch_id]
+        if batch["polls_left"] > 0:
+            batch["polls_left"] -= 1
+            return {"id": batch_id, "status": "in_progress", "output_file_id": None, "error_file_id": None}
+        batch["status"] = "completed"
+        return {key: batch[key] for key in ("id", "status", "output_file_id", "error_file_id")}
+
+    def download(self, file_id):
+        return self.files[file_id]
+
+    def _store(self, content):
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = content
+        return file_id
+
+
+class BatchAnalysisRunner:
+    """Writes chat completion requests to JSONL, submits them as a batch and collects the replies.
+
+    Batches that are still running when wait() gives up are recorded in a state file
+    so the next scheduled run can pick up their results instead of resubmitting.
+    """
+
+    def __init__(self, client, work_dir="batches", poll_interval=15, max_poll_interval=300, max_wait=3600):
+        """
+        Args:
+            client: Batch client (OpenAIBatchClient or FakeBatchClient)
+            work_dir: Directory for request files and the pending-batch state file
+            poll_interval: Initial delay between status checks in seconds
+            max_poll_interval: Upper bound for the delay between status checks
+            max_wait: Maximum seconds to wait for a batch in one run
+        """
+        self.client = client
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_wait = max_wait
+        self.state_file = os.path.join(work_dir, "pending_batches.json")
+        os.makedirs(work_dir, exist_ok=True)
+
+    def write_requests(self, requests):
+        """
+        Write chat completion requests to a JSONL file in the Batch API format.
+
+        Args:
+            requests: Iterable of (custom_id, body) tuples
+
+        Returns:
+            Path of the written file
+        """
+        path = os.path.join(self.work_dir, f"analysis_requests_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        with open(path, "w") as f:
+            for custom_id, body in requests:
+                f.write(json.dumps({
+                    "custom_id": str(custom_id),
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_ENDPOINT,
+                    "body": body
+                }) + "\n")
+        return path
+
+    def submit(self, requests, claimed_by=None):
+        """
+        Write, upload and submit a batch.
+
+        Args:
+            requests: Iterable of (custom_id, body) tuples
+            claimed_by: Optional work queue worker ID holding the claims on the batch's jobs,
+                        recorded so whichever run collects the batch can release them
+
+        Returns:
+            The batch ID, or None if there was nothing to submit
+        """
+        requests = list(requests)
+        if not requests:
+            return None
+        path = self.write_requests(requests)
+        file_id = self.client.upload(path)
+        batch_id = self.client.create(file_id, metadata={"source": "job_fitness_analysis"})
+        self._save_pending(self.pending_batches() + [{
+            "batch_id": batch_id,
+            "custom_ids": [str(custom_id) for custom_id, _ in requests],
+            "claimed_by": claimed_by,
+            "submitted_at": datetime.now().isoformat()
+        }])
+        logger.info(f"Submitted batch {batch_id} with {len(requests)} requests")
+        return batch_id
+
+    def wait(self, batch_id):
+        """Poll a batch with exponential backoff until it finishes or max_wait elapses.
+
+        Returns:
+            Final batch status dictionary, or None if the batch is still running
+        """
+        start = time.monotonic()
+        delay = self.poll_interval
+        while True:
+            batch = self.client.retrieve(batch_id)
+            if batch["status"] in FINAL_STATUSES:
+                return batch
+            if time.monotonic() - start + delay > self.max_wait:
+                logger.info(f"Batch {batch_id} still {batch['status']}, will check again next run")
+                return None
+            time.sleep(delay)
+            delay = min(self.max_poll_interval, delay * 2)
+
+    def collect(self, batch):
+        """
+        Read the replies of a finished batch. The batch stays in the pending state until
+        forget() is called, so results that could not be stored are collected again next run.
+
+        Returns:
+            Dictionary mapping custom_id to the reply text (None for failed requests)
+        """
+        results = {}
+        if batch.get("output_file_id"):
+            for line in self.client.download(batch["output_file_id"]).splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    results[record["custom_id"]] = None
+        if batch.get("error_file_id"):
+            for line in self.client.download(batch["error_file_id"]).splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                    results.setdefault(record["custom_id"], None)
+        return results
+
+    def forget(self, batch_id):
+        """Drop a batch from the pending state once its results are stored."""
+        self._save_pending([entry for entry in self.pending_batches() if entry["batch_id"] != batch_id])
+
+    def pending_batches(self):
+        """Return the batches submitted earlier whose results have not been collected yet."""
+        if not os.path.exists(self.state_file):
+            return []
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read pending batch state: {str(e)}")
+            return []
+
+    def pending_custom_ids(self):
+        """Return the custom IDs that are part of a batch still awaiting collection."""
+        return {custom_id for entry in self.pending_batches() for custom_id in entry["custom_ids"]}
+
+    def _save_pending(self, entries):
+        with open(self.state_file, "w") as f:
+            json.dump(entries, f, indent=2)
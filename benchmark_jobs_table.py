@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark write paths for the jobs table.
+Compares rows per second for:
+1. Ingestion: row-by-row INSERT with a commit per row, execute_values upsert, and COPY staging upsert
+2. Enrichment: row-by-row UPDATE with a commit per row and batched UPDATE ... FROM (VALUES ...)
+
+The benchmark runs against a session-local temporary copy of the jobs table, which
+shadows the real table for this connection only, so no existing data is touched.
+
+Usage:
+    python benchmark_jobs_table.py                 # 5000 synthetic jobs
+    python benchmark_jobs_table.py --rows 20000    # Larger run
+"""
+
+import time
+import random
+import string
+import argparse
+from dotenv import load_dotenv
+from db_pool import get_pool
+from jobs_table import JOB_COLUMNS, job_row, upsert_jobs, copy_upsert_jobs, bulk_update
+
+load_dotenv()
+
+def make_items(count, description_chars, seed=0):
+    """Generate synthetic Apify job items."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(2000)]
+
+    def text(chars):
+        out = []
+        length = 0
+        while length < chars:
+            word = rng.choice(words)
+            out.append(word)
+            length += len(word) + 1
+        return " ".join(out)
+
+    items = []
+    for i in range(count):
+        description = text(description_chars)
+        items.append({
+            'id': f"bench-{i}",
+            'title': text(40),
+            'companyName': text(20),
+            'location': "Berlin, Germany",
+            'jobUrl': f"https://www.linkedin.com/jobs/view/bench-{i}",
+            'experienceLevel': "Mid-Senior level",
+            'workType': "Full-time",
+            'description': description,
+            'descriptionHtml': f"<p>{description}</p>",
+            'publishedAt': "2024-05-01",
+            'postedTime': "1 day ago",
+        })
+    return items
+
+def create_scratch_table(conn):
+    """Create a temporary jobs table that shadows the real one for this session."""
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS pg_temp.jobs")
+        cur.execute("CREATE TEMP TABLE jobs (LIKE public.jobs INCLUDING ALL)")
+        # Use a private identity instead of the real table's sequence
+        cur.execute("ALTER TABLE pg_temp.jobs ALTER COLUMN id DROP DEFAULT")
+        cur.execute("ALTER TABLE pg_temp.jobs ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+        cur.execute("ALTER TABLE pg_temp.jobs ADD COLUMN IF NOT EXISTS keyword TEXT")
+        cur.execute("ALTER TABLE pg_temp.jobs ADD COLUMN IF NOT EXISTS rag_info TEXT")
+    conn.commit()
+
+def truncate(conn):
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE pg_temp.jobs")
+    conn.commit()
+
+def insert_row_by_row(conn, items):
+    """Baseline: one INSERT and one commit per job."""
+    placeholders = ", ".join(["%s"] * len(JOB_COLUMNS))
+    for item in items:
+        row = job_row(item)
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO jobs ({", ".join(JOB_COLUMNS)})
+                VALUES ({placeholders})
+                ON CONFLICT (job_id) DO NOTHING
+            """, row)
+        conn.commit()
+
+def update_row_by_row(conn, rows):
+    """Baseline: one UPDATE and one commit per job."""
+    for job_id, keyword in rows:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE jobs SET keyword = %s WHERE job_id = %s", (keyword, job_id))
+        conn.commit()
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {count:>8} rows {elapsed:>8.2f} s {count / elapsed:>10.0f} rows/s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark jobs table write paths')
+    parser.add_argument('--rows', type=int, default=5000, help='Number of synthetic jobs')
+    parser.add_argument('--description-chars', type=int, default=3000, help='Approximate description length')
+    parser.add_argument('--page-size', type=int, default=500, help='Rows per bulk write')
+    args = parser.parse_args()
+
+    items = make_items(args.rows, args.description_chars)
+    pages = [items[i:i + args.page_size] for i in range(0, len(items), args.page_size)]
+    keyword_rows = [(item['id'], "python, sql, machine learning") for item in items]
+
+    # One connection for the whole run, since the scratch table is session-local
+    conn = get_pool().getconn()
+    try:
+        create_scratch_table(conn)
+        print("Ingestion")
+
+        def run_pages(upsert):
+            for page in pages:
+                upsert(conn, page)
+                conn.commit()
+
+        timed("  row-by-row INSERT + commit", len(items), lambda: insert_row_by_row(conn, items))
+        truncate(conn)
+        timed("  execute_values upsert", len(items), lambda: run_pages(upsert_jobs))
+        truncate(conn)
+        timed("  COPY staging upsert", len(items), lambda: run_pages(copy_upsert_jobs))
+        timed("  COPY staging upsert (update)", len(items), lambda: run_pages(copy_upsert_jobs))
+
+        print("Enrichment")
+        timed("  row-by-row UPDATE + commit", len(keyword_rows), lambda: update_row_by_row(conn, keyword_rows))
+
+        def run_bulk_update():
+            for i in range(0, len(keyword_rows), args.page_size):
+                bulk_update(conn, ['keyword'], keyword_rows[i:i + args.page_size])
+                conn.commit()
+
+        timed("  UPDATE ... FROM (VALUES ...)", len(keyword_rows), run_bulk_update)
+    finally:
+        conn.rollback()
+        # Drop the scratch tables before the connection goes back to the pool
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS pg_temp.jobs_staging")
+            cur.execute("DROP TABLE IF EXISTS pg_temp.jobs")
+        conn.commit()
+        get_pool().putconn(conn)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+import re
+import json
+import math
+import threading
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it its my of on or our that the
+their these this to was were will with you your
+""".split())
+
+EXPORT_FIELDS = ["content", "file_path", "chunk_index", "metadata"]
+
+# Milvus returns at most this many entities from one query (offset + limit)
+MILVUS_QUERY_LIMIT = 16384
+
+
+def tokenize(text):
+    """Lowercase and split text into index terms, dropping common stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def export_collection(collection, expr=None, batch_size=1000):
+    """Yield all entities of a Milvus collection (optionally filtered by expr) with their primary key.
+
+    Args:
+        collection: pymilvus Collection to export
+        expr: Optional boolean filter expression
+        batch_size: Number of entities fetched per request
+
+    Yields:
+        Entity dictionaries containing the primary key and EXPORT_FIELDS
+    """
+    pk_field = collection.schema.primary_field.name
+    output_fields = [pk_field] + EXPORT_FIELDS
+
+    if hasattr(collection, "query_iterator"):
+        iterator = collection.query_iterator(batch_size=batch_size, expr=expr or "", output_fields=output_fields)
+        try:
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            iterator.close()
+    else:
+        # Older pymilvus versions without iterators: one query, paged by primary key if it hits the cap
+        rows = collection.query(expr=expr or f"{pk_field} >= 0", output_fields=output_fields, limit=MILVUS_QUERY_LIMIT)
+        if len(rows) < MILVUS_QUERY_LIMIT:
+            yield from rows
+            return
+        if not all(isinstance(row[pk_field], int) for row in rows):
+            logger.warning(f"Export stopped at {MILVUS_QUERY_LIMIT} entities: paging needs integer primary keys")
+            yield from rows
+            return
+        pks = sorted(_integer_primary_keys(collection, pk_field, expr))
+        for start in range(0, len(pks), batch_size):
+            yield from collection.query(expr=f"{pk_field} in {pks[start:start + batch_size]}",
+                                        output_fields=output_fields)
+
+
+def _integer_primary_keys(collection, pk_field, expr=None):
+    """Return every integer primary key matching expr.
+
+    Queries primary keys only, halving the key range of any query that hits
+    MILVUS_QUERY_LIMIT until every range fits in one query.
+    """
+    pks = []
+    ranges = [(-(1 << 63), (1 << 63) - 1)]
+    while ranges:
+        low, high = ranges.pop()
+        range_expr = f"{pk_field} >= {low} and {pk_field} <= {high}"
+        if expr:
+            range_expr += f" and ({expr})"
+        rows = collection.query(expr=range_expr, output_fields=[pk_field], limit=MILVUS_QUERY_LIMIT)
+        if len(rows) < MILVUS_QUERY_LIMIT or low == high:
+            pks.extend(row[pk_field] for row in rows)
+        else:
+            middle = (low + high) // 2
+            ranges.extend([(middle + 1, high), (low, middle)])
+    return pks
+
+
+class BM25Index:
+    """In-process BM25 inverted index over the chunks of the personal_rag collection.
+
+    Documents are keyed by the collection's primary key and keep the fields needed
+    to answer a query without going back to Milvus.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = {}
+        self.term_freqs = {}
+        self.doc_lengths = {}
+        self.postings = {}
+        self.total_length = 0
+        # Collection version marker (RAG_COLLECTION_VERSION) the index was built for
+        self.version_marker = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add_documents(self, entities, pk_field="id"):
+        """Add or replace documents in the index.
+
+        Args:
+            entities: Iterable of entity dictionaries (as returned by export_collection)
+            pk_field: Name of the primary key field in each entity
+        """
+        added = 0
+        with self.lock:
+            for entity in entities:
+                pk = entity[pk_field]
+                if pk in self.documents:
+                    self.remove_document(pk)
+                document = {field: entity.get(field) for field in EXPORT_FIELDS}
+                terms = Counter(tokenize(document.get("content") or ""))
+                self._insert(pk, document, dict(terms))
+                added += 1
+        return added
+
+    def _insert(self, pk, document, terms):
+        self.documents[pk] = document
+        self.term_freqs[pk] = terms
+        self.doc_lengths[pk] = sum(terms.values())
+        self.total_length += self.doc_lengths[pk]
+        for term, freq in terms.items():
+            self.postings.setdefault(term, {})[pk] = freq
+
+    def remove_document(self, pk):
+        """Remove a document from the index if present."""
+        with self.lock:
+            terms = self.term_freqs.pop(pk, None)
+            if terms is None:
+                return
+            self.documents.pop(pk, None)
+            self.total_length -= self.doc_lengths.pop(pk, 0)
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(pk, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def search(self, query, limit=10):
+        """Rank documents against a query.
+
+        Returns:
+            List of (primary_key, document, score) tuples, best match first
+        """
+        with self.lock:
+            n_docs = len(self.documents)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs or 1.0
+
+            scores = {}
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for pk, freq in posting.items():
+                    length = self.doc_lengths[pk]
+                    denom = freq + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[pk] = scores.get(pk, 0.0) + idf * freq * (self.k1 + 1) / denom
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [(pk, self.documents[pk], score) for pk, score in ranked]
+
+    def build_from_collection(self, collection, batch_size=1000, version_marker=""):
+        """Rebuild the index from a full export of a Milvus collection."""
+        pk_field = collection.schema.primary_field.name
+        with self.lock:
+            self.documents, self.term_freqs, self.doc_lengths, self.postings = {}, {}, {}, {}
+            self.total_length = 0
+            self.version_marker = version_marker
+            count = self.add_documents(export_collection(collection, batch_size=batch_size), pk_field)
+        logger.info(f"Built BM25 index with {count} chunks")
+        return count
+
+    def refresh_from_collection(self, collection, batch_size=1000, version_marker=""):
+        """Incrementally add chunks inserted since the last build or refresh.
+
+        New chunks are detected by primary key, so a delete plus insert that leaves
+        the entity count unchanged is still noticed. If the collection shrank, its
+        primary keys are not integers or version_marker (RAG_COLLECTION_VERSION)
+        changed, the index is rebuilt from scratch.
+        """
+        pk_field = collection.schema.primary_field
+        entity_count = collection.num_entities
+
+        with self.lock:
+            if version_marker != self.version_marker:
+                return self.build_from_collection(collection, batch_size, version_marker)
+
+            integer_keys = all(isinstance(pk, int) for pk in self.documents)
+            if entity_count == len(self.documents):
+                if not integer_keys or not self.documents:
+                    return 0
+                # Same count; replaced chunks show up as keys above the high-water mark
+                newer = collection.query(expr=f"{pk_field.name} > {max(self.documents)}",
+                                         output_fields=[pk_field.name], limit=1)
+                if not newer:
+                    return 0
+
+            if not self.documents or entity_count < len(self.documents) or not integer_keys:
+                return self.build_from_collection(collection, batch_size, version_marker)
+
+            expr = f"{pk_field.name} > {max(self.documents)}"
+            added = self.add_documents(export_collection(collection, expr, batch_size), pk_field.name)
+
+            # Deletions or updates below the high-water mark need a full rebuild
+            if len(self.documents) != entity_count:
+                return self.build_from_collection(collection, batch_size, version_marker)
+
+        logger.info(f"Added {added} new chunks to BM25 index")
+        return added
+
+    def save(self, path):
+        """Persist the index to a JSON file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            records = [
+                {"pk": pk, "document": self.documents[pk], "terms": self.term_freqs[pk]}
+                for pk in self.documents
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"k1": self.k1, "b": self.b, "version_marker": self.version_marker, "records": records}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index previously written with save()."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        index.version_marker = data.get("version_marker")
+        for record in data.get("records", []):
+            index._insert(record["pk"], record["document"], record["terms"])
+        return index
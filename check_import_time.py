@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Check the cold-start import time of the non-RAG entry points.
+Each module is imported in a fresh interpreter with `python -X importtime`,
+and the check fails if:
+1. Its cumulative import time exceeds the budget
+2. It pulls in any of the heavy ML/LLM libraries, which must only load when RAG is used
+
+Usage:
+    python check_import_time.py                  # Check all entry points with the default budget
+    python check_import_time.py --budget-ms 500  # Use a stricter budget
+    python check_import_time.py email_service    # Check specific modules only
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+# Entry points that must start without loading the RAG stack
+DEFAULT_MODULES = ['email_service', 'main', 'run_job_processing', 'process_jobs_rag', 'apify_wrapper']
+
+# Libraries that may only be imported by the code paths that use them
+HEAVY_MODULES = ['torch', 'transformers', 'langchain', 'langchain_openai', 'langchain_community',
+                 'langchain_core', 'pymilvus', 'anthropic', 'PIL']
+
+def measure_import(module, python=sys.executable):
+    """
+    Import a module in a fresh interpreter and collect its import timings.
+
+    Args:
+        module (str): Name of the module to import
+        python (str): Python executable to use
+
+    Returns:
+        tuple: (cumulative import time of the module in ms, set of all imported module names)
+    """
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    cumulative_ms = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _, cumulative, name = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        imported.add(name)
+        if name == module:
+            cumulative_ms = int(cumulative) / 1000
+    return cumulative_ms, imported
+
+def check_modules(modules, budget_ms, repeat=3):
+    """Check every module against the budget and the heavy-module list. Returns True if all pass."""
+    all_passed = True
+    for module in modules:
+        try:
+            # Keep the fastest of several runs to reduce noise from the OS cache
+            runs = [measure_import(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"FAIL {module}: {str(e)}")
+            all_passed = False
+            continue
+
+        elapsed_ms = min(run[0] for run in runs)
+        heavy = sorted({name.split('.')[0] for name in runs[0][1]} & set(HEAVY_MODULES))
+
+        problems = []
+        if elapsed_ms > budget_ms:
+            problems.append(f"{elapsed_ms:.0f} ms exceeds budget of {budget_ms:.0f} ms")
+        if heavy:
+            problems.append(f"imports heavy modules: {', '.join(heavy)}")
+
+        if problems:
+            print(f"FAIL {module}: {'; '.join(problems)}")
+            all_passed = False
+        else:
+            print(f"OK   {module}: {elapsed_ms:.0f} ms")
+    return all_passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check cold-start import time of non-RAG entry points')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='Modules to check')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_TIME_BUDGET_MS', 800)),
+                        help='Maximum cumulative import time per module in milliseconds')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs per module')
+    args = parser.parse_args()
+
+    sys.exit(0 if check_modules(args.modules, args.budget_ms, args.repeat) else 1)
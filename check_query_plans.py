@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Check that the pipeline queue queries are served by their partial indexes.
+
+Builds the jobs table from create_table.sql and the migrations in a scratch schema,
+fills it with synthetic jobs (most of them finished, a few in every pending state),
+and runs EXPLAIN on the stage, work queue, deduplication and newsletter queries.
+Every query must use its index; the queries that only need indexed columns must get
+an Index Only Scan. The scratch schema is dropped afterwards, so existing data is
+never touched.
+
+Usage:
+    python check_query_plans.py                 # 100k synthetic jobs
+    python check_query_plans.py --rows 500000   # Larger table
+    python check_query_plans.py --verbose       # Print every plan
+"""
+
+import os
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+from db_pool import get_pool
+from migrate import apply_migrations
+
+load_dotenv()
+
+SCRATCH_SCHEMA = 'jobs_plan_check'
+
+# Out of every 100 jobs: 2 need keywords, 2 need RAG info, 2 need analysis, 1 needs a score,
+# 3 are duplicates and the rest are done; every 1000th job has no fingerprint yet
+SYNTHETIC_JOBS = """
+    INSERT INTO jobs (job_id, title, company_name, description, created_at,
+                      keyword, rag_info, gpt_analysis, score, content_hash, duplicate_of)
+    SELECT 'synthetic-' || i,
+           'Job ' || i,
+           'Company ' || (i %% 500),
+           repeat('synthetic job description ', 20),
+           now() - (i %% 60) * interval '1 day' - (i %% 1440) * interval '1 minute',
+           CASE WHEN i %% 100 < 2 THEN NULL ELSE 'python, sql' END,
+           CASE WHEN i %% 100 < 4 THEN NULL ELSE 'rag info' END,
+           CASE WHEN i %% 100 < 6 OR i %% 100 BETWEEN 7 AND 9 THEN NULL ELSE 'Score: 7' END,
+           CASE WHEN i %% 100 < 10 THEN NULL ELSE (i %% 10) + 0.5 END,
+           CASE WHEN i %% 1000 = 0 THEN NULL ELSE md5(i::text) END,
+           CASE WHEN i %% 100 BETWEEN 7 AND 9 THEN 'synthetic-0' END
+    FROM generate_series(1, %s) AS i
+"""
+
+PENDING_STATES = ('needs_keywords', 'needs_rag', 'needs_analysis', 'needs_score')
+
+# (description, query, expected index, index-only scan required)
+QUERIES = [
+    *[(f"count {state}", f"SELECT count(*) FROM jobs WHERE pipeline_state = '{state}'",
+       f"idx_pipeline_{state}", True) for state in PENDING_STATES],
+    ("keyword stage page ids",
+     "SELECT id FROM jobs WHERE pipeline_state = 'needs_keywords' ORDER BY id LIMIT 50",
+     "idx_pipeline_needs_keywords", True),
+    ("keyword stage select",
+     "SELECT id, job_id, title, description FROM jobs WHERE pipeline_state = 'needs_keywords' ORDER BY id LIMIT 50",
+     "idx_pipeline_needs_keywords", False),
+    ("RAG stage select",
+     "SELECT id, job_id, title, keyword FROM jobs WHERE pipeline_state = 'needs_rag' ORDER BY id LIMIT 25",
+     "idx_pipeline_needs_rag", False),
+    ("analysis stage select",
+     "SELECT id, job_id, title, description, rag_info FROM jobs WHERE pipeline_state = 'needs_analysis' ORDER BY id LIMIT 25",
+     "idx_pipeline_needs_analysis", False),
+    ("score backfill select",
+     "SELECT job_id, gpt_analysis FROM jobs WHERE pipeline_state = 'needs_score'",
+     "idx_pipeline_needs_score", False),
+    ("work queue candidates",
+     """SELECT id FROM jobs
+        WHERE pipeline_state IN ('needs_keywords', 'needs_rag', 'needs_analysis')
+          AND id > 0 AND (claimed_until IS NULL OR claimed_until < now())
+        ORDER BY id LIMIT 25""",
+     "idx_pipeline_work_queue", True),
+    ("work queue candidates (batch mode)",
+     """SELECT id FROM jobs
+        WHERE pipeline_state IN ('needs_keywords', 'needs_rag')
+          AND id > 0 AND (claimed_until IS NULL OR claimed_until < now())
+        ORDER BY id LIMIT 25""",
+     "idx_pipeline_work_queue", True),
+    ("work queue claim",
+     """UPDATE jobs SET claimed_by = 'plan-check', claimed_until = now() + interval '15 minutes'
+        WHERE id IN (
+            SELECT id FROM jobs
+            WHERE pipeline_state IN ('needs_keywords', 'needs_rag', 'needs_analysis')
+              AND id > 0 AND (claimed_until IS NULL OR claimed_until < now())
+            ORDER BY id LIMIT 25
+            FOR UPDATE SKIP LOCKED
+        )""",
+     "idx_pipeline_work_queue", False),
+    ("unfingerprinted jobs",
+     "SELECT id FROM jobs WHERE content_hash IS NULL ORDER BY id LIMIT 1000",
+     "idx_unfingerprinted", True),
+    ("newsletter ranking",
+     "SELECT created_at, score FROM jobs WHERE created_at > now() - interval '1 day' ORDER BY score DESC NULLS LAST LIMIT 7",
+     "idx_created_at_score", True),
+    ("newsletter select",
+     "SELECT * FROM jobs WHERE created_at > now() - interval '1 day' ORDER BY score DESC NULLS LAST LIMIT 7",
+     "idx_created_at_score", False),
+]
+
+
+def plan_nodes(plan):
+    """Yield every node of a JSON query plan."""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def explain(cur, query):
+    cur.execute(f"EXPLAIN (FORMAT JSON) {query}")
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]['Plan']
+
+
+def describe(plan):
+    """Summarize the scans of a plan, e.g. 'Index Only Scan(idx_unfingerprinted)'."""
+    scans = []
+    for node in plan_nodes(plan):
+        if 'Scan' in node['Node Type']:
+            target = node.get('Index Name') or node.get('Relation Name', '')
+            scans.append(f"{node['Node Type']}({target})")
+    return ", ".join(scans)
+
+
+def check_plan(plan, index_name, index_only):
+    """Return True if the plan reads the expected index (with an Index Only Scan if required)."""
+    for node in plan_nodes(plan):
+        if node.get('Index Name') != index_name:
+            continue
+        if not index_only or node['Node Type'] == 'Index Only Scan':
+            return True
+    return False
+
+
+def build_table(conn, rows):
+    """Create and fill the scratch jobs table (the connection is in autocommit mode)."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+        cur.execute(f"SET search_path TO {SCRATCH_SCHEMA}")
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'create_table.sql'), 'r') as f:
+            cur.execute(f.read())
+    # No-ops on a fresh table; running them checks that they agree with create_table.sql
+    apply_migrations(conn, log=print)
+    with conn.cursor() as cur:
+        cur.execute(SYNTHETIC_JOBS, (rows,))
+        # Index-only scans need an up-to-date visibility map
+        cur.execute("VACUUM ANALYZE jobs")
+        cur.execute("SELECT pipeline_state, count(*) FROM jobs GROUP BY 1 ORDER BY 1")
+        for state, count in cur.fetchall():
+            print(f"  {state:<16} {count:>8} jobs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check query plans of the pipeline queue queries')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of synthetic jobs')
+    parser.add_argument('--verbose', action='store_true', help='Print every plan')
+    parser.add_argument('--keep', action='store_true', help=f'Keep the {SCRATCH_SCHEMA} schema afterwards')
+    args = parser.parse_args()
+
+    conn = get_pool().getconn()
+    conn.autocommit = True
+    failures = 0
+    try:
+        print(f"Building {args.rows} synthetic jobs in schema {SCRATCH_SCHEMA}")
+        build_table(conn, args.rows)
+
+        with conn.cursor() as cur:
+            for description, query, index_name, index_only in QUERIES:
+                plan = explain(cur, query)
+                ok = check_plan(plan, index_name, index_only)
+                failures += not ok
+                expected = "Index Only Scan" if index_only else "index"
+                print(f"{'PASS' if ok else 'FAIL'}  {description:<36} {expected} on {index_name}: {describe(plan)}")
+                if args.verbose or not ok:
+                    print(json.dumps(plan, indent=2))
+    finally:
+        with conn.cursor() as cur:
+            if not args.keep:
+                cur.execute(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE")
+            cur.execute("RESET search_path")
+        conn.autocommit = False
+        get_pool().putconn(conn)
+
+    if failures:
+        print(f"{failures} of {len(QUERIES)} queries do not use their index as expected")
+        sys.exit(1)
+    print(f"All {len(QUERIES)} queries use their index as expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+-- Creates the jobs table at the latest schema version. Existing tables are upgraded
+-- with `python migrate.py` instead (see migrations/); run it after this script too,
+-- so the versions are recorded in schema_migrations.
+
 -- Drop the existing table if it exists
 DROP TABLE IF EXISTS jobs;
 
@@ -37,10 +41,36 @@ CREATE TABLE jobs (
     posted_time TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
+    -- Enrichment fields
+    keyword TEXT,
+    rag_info TEXT,
+    
     -- Analysis fields
     is_best_fit BOOLEAN DEFAULT FALSE,
     gpt_analysis TEXT,
-    score NUMERIC(4,1)
+    score NUMERIC(4,1),
+    
+    -- Duplicate detection (reposts reuse the enrichment of the canonical job)
+    content_hash TEXT,
+    minhash BIGINT[],
+    lsh_bands TEXT[],
+    duplicate_of TEXT,
+    
+    -- Work queue leases
+    claimed_by TEXT,
+    claimed_until TIMESTAMP,
+    
+    -- Pipeline state, derived from the enrichment columns
+    pipeline_state TEXT GENERATED ALWAYS AS (
+        CASE
+            WHEN gpt_analysis IS NOT NULL THEN
+                CASE WHEN score IS NULL THEN 'needs_score' ELSE 'done' END
+            WHEN duplicate_of IS NOT NULL THEN 'duplicate'
+            WHEN keyword IS NULL THEN 'needs_keywords'
+            WHEN rag_info IS NULL THEN 'needs_rag'
+            ELSE 'needs_analysis'
+        END
+    ) STORED
 );
 
 -- Create indexes for better query performance
@@ -49,4 +79,17 @@ CREATE INDEX idx_company_name ON jobs(company_name);
 CREATE INDEX idx_location ON jobs(location);
 CREATE INDEX idx_published_at ON jobs(published_at);
 CREATE INDEX idx_is_best_fit ON jobs(is_best_fit);
-CREATE INDEX idx_score ON jobs(score); 
\ No newline at end of file
+CREATE INDEX idx_score ON jobs(score); 
+CREATE INDEX idx_content_hash ON jobs(content_hash);
+CREATE INDEX idx_lsh_bands ON jobs USING GIN (lsh_bands);
+CREATE INDEX idx_duplicate_of ON jobs(duplicate_of);
+CREATE INDEX idx_created_at_score ON jobs(created_at, score DESC NULLS LAST);
+
+-- Partial indexes for the pipeline queue queries (only pending jobs are indexed)
+CREATE INDEX idx_pipeline_needs_keywords ON jobs(id) WHERE pipeline_state = 'needs_keywords';
+CREATE INDEX idx_pipeline_needs_rag ON jobs(id) WHERE pipeline_state = 'needs_rag';
+CREATE INDEX idx_pipeline_needs_analysis ON jobs(id) WHERE pipeline_state = 'needs_analysis';
+CREATE INDEX idx_pipeline_needs_score ON jobs(id) WHERE pipeline_state = 'needs_score';
+CREATE INDEX idx_pipeline_work_queue ON jobs(id) INCLUDE (pipeline_state, claimed_until)
+    WHERE pipeline_state IN ('needs_keywords', 'needs_rag', 'needs_analysis');
+CREATE INDEX idx_unfingerprinted ON jobs(id) WHERE content_hash IS NULL;
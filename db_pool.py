@@ -0,0 +1,229 @@
+import os
+import time
+import logging
+import threading
+import collections
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe PostgreSQL connection pool.
+
+    Callers wait (up to timeout seconds) for a free connection instead of failing
+    when all maxconn connections are in use. Connections that sat idle longer than
+    health_check_interval are checked with SELECT 1 before being handed out, and
+    broken ones are replaced. Returned connections are rolled back if they were
+    left inside a transaction.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=30.0, health_check_interval=30.0, **connect_kwargs):
+        """
+        Args:
+            minconn: Connections opened up front
+            maxconn: Maximum number of open connections
+            timeout: Maximum seconds to wait for a free connection
+            health_check_interval: Idle seconds after which a connection is checked before reuse
+            **connect_kwargs: Arguments for psycopg2.connect
+        """
+        self.minconn = minconn
+        self.maxconn = max(1, maxconn)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.connect_kwargs = connect_kwargs
+        self._idle = collections.deque()
+        self._size = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.health_check_failures = 0
+        self.connections_opened = 0
+
+        for _ in range(min(minconn, self.maxconn)):
+            with self._cond:
+                self._size += 1
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        try:
+            conn = psycopg2.connect(**self.connect_kwargs)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.connections_opened += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """Check out a connection, waiting for one to be returned if the pool is exhausted."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()  # most recently used first keeps connections warm
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No database connection available within {self.timeout} seconds")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 0.001:
+                self.waits += 1
+
+        if conn is None:
+            conn = self._connect()
+        elif not self._is_healthy(conn, last_used):
+            with self._cond:
+                self.health_check_failures += 1
+            logger.warning("Replacing broken database connection")
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = self._connect()
+
+        with self._cond:
+            self._in_use += 1
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool (closing it if requested or broken)."""
+        if not close and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                close = True
+        with self._cond:
+            self._in_use -= 1
+            if close or conn.closed:
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and returns it afterwards."""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def lease(self):
+        """Check out a connection for a longer-lived user; release it with close()."""
+        return PooledConnection(self)
+
+    def closeall(self):
+        """Close all idle connections."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def stats(self):
+        """Return pool size and wait-time metrics."""
+        with self._cond:
+            return {
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'max_size': self.maxconn,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'avg_wait_ms': round(1000 * self.total_wait / self.checkouts, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(1000 * self.max_wait, 2),
+                'timeouts': self.timeouts,
+                'health_check_failures': self.health_check_failures,
+                'connections_opened': self.connections_opened,
+            }
+
+
+class PooledConnection:
+    """A connection held from the pool by one user (e.g. a JobProcessor run), exposing .conn and .close()."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = pool.getconn()
+
+    def close(self):
+        """Return the connection to the pool."""
+        if self.conn is not None:
+            self.pool.putconn(self.conn)
+            self.conn = None
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, configured from the DB_* environment variables."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A forked child must not share its parent's connections
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(
+                minconn=int(os.getenv('DB_POOL_MIN', 1)),
+                maxconn=int(os.getenv('DB_POOL_MAX', 10)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+                health_check_interval=float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+                host=os.getenv('DB_HOST'),
+                port=os.getenv('DB_PORT'),
+                database=os.getenv('DB_NAME'),
+                user=os.getenv('DB_USER'),
+                password=os.getenv('DB_PASSWORD')
+            )
+            _pool_pid = os.getpid()
+        return _pool
@@ -5,8 +5,8 @@ from email.mime.multipart import MIMEMultipart
 from jinja2 import Template
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from db_pool import get_pool
 
 load_dotenv()
 
@@ -18,27 +18,11 @@ class EmailService:
         self.email_password = os.getenv('EMAIL_PASSWORD')
         self.email_sender = os.getenv('EMAIL_SENDER', self.email_user)
         self.recipient_email = os.getenv('RECIPIENT_EMAIL')
-        # Database connection
-        self.db_host = os.getenv('DB_HOST')
-        self.db_port = os.getenv('DB_PORT')
-        self.db_name = os.getenv('DB_NAME')
-        self.db_user = os.getenv('DB_USER')
-        self.db_password = os.getenv('DB_PASSWORD')
         # Create emails directory if it doesn't exist
         os.makedirs('emails', exist_ok=True)
         # Store the last run time
         self.last_run_file = 'last_email_run.txt'
     
-    def _get_db_connection(self):
-        """Get a connection to the database."""
-        return psycopg2.connect(
-            host=self.db_host,
-            port=self.db_port,
-            database=self.db_name,
-            user=self.db_user,
-            password=self.db_password
-        )
-    
     def _get_last_run_time(self):
         """Get the last time the email service was run."""
         if os.path.exists(self.last_run_file):
@@ -70,9 +54,9 @@ class EmailService:
         """
         last_run = self._get_last_run_time()
         
-        conn = self._get_db_connection()
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # Reuse a connection from the shared pool instead of connecting for every call
+            with get_pool().connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT *
                     FROM jobs
@@ -87,8 +71,6 @@ class EmailService:
         except Exception as e:
             print(f"Error retrieving jobs: {str(e)}")
             return []
-        finally:
-            conn.close()
 
     def send_job_newsletter(self, recipient_email=None):
         """
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Apify API endpoints used by ApifyWrapper, for tests and dry runs.
+Task runs write their dataset items gradually over a configurable duration, so
+streaming ingestion and waitForFinish long polling can be exercised without an
+Apify account.
+
+Supported endpoints:
+    POST /v2/actor-tasks/{taskId}/runs          Start a task run
+    GET  /v2/actor-runs/{runId}?waitForFinish=N Get a run, optionally long-polling until it finishes
+    GET  /v2/datasets/{datasetId}/items         List dataset items (offset/limit pagination)
+
+Usage:
+    python fake_apify_server.py --port 8765 --items 200 --duration 20
+    APIFY_API_URL=http://127.0.0.1:8765 python run_job_processing.py
+"""
+
+import json
+import time
+import uuid
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+def make_job_items(task_id, count, prefix="fake"):
+    """Generate synthetic LinkedIn job items in the shape produced by the scraping actor."""
+    return [{
+        'id': f"{prefix}-{task_id}-{i}",
+        'title': f"Data Scientist {i}",
+        'companyName': f"Company {i % 17}",
+        'location': "Berlin, Germany",
+        'jobUrl': f"https://www.linkedin.com/jobs/view/{prefix}-{task_id}-{i}",
+        'experienceLevel': "Mid-Senior level",
+        'workType': "Full-time",
+        'description': f"We are looking for a data scientist with Python and SQL experience. Posting {i}.",
+        'publishedAt': datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        'postedTime': "1 day ago",
+    } for i in range(count)]
+
+class FakeRun:
+    """A task run whose items become visible linearly over its duration."""
+
+    def __init__(self, task_id, run_input, items, duration, final_status):
+        self.id = uuid.uuid4().hex[:17]
+        self.task_id = task_id
+        self.run_input = run_input
+        self.dataset_id = uuid.uuid4().hex[:17]
+        self.items = items
+        self.duration = duration
+        self.final_status = final_status
+        self.started = time.time()
+
+    def is_finished(self):
+        return time.time() - self.started >= self.duration
+
+    def visible_items(self):
+        if self.is_finished() or not self.duration:
+            return self.items
+        fraction = (time.time() - self.started) / self.duration
+        return self.items[:int(len(self.items) * fraction)]
+
+    def to_dict(self):
+        finished = self.is_finished()
+        return {
+            'id': self.id,
+            'actId': 'fake-actor',
+            'actorTaskId': self.task_id,
+            'status': self.final_status if finished else 'RUNNING',
+            'startedAt': datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            'finishedAt': datetime.now(timezone.utc).isoformat() if finished else None,
+            'defaultDatasetId': self.dataset_id,
+        }
+
+class FakeApifyServer:
+    """In-process HTTP server emulating the Apify API for task runs and datasets."""
+
+    def __init__(self, items=None, item_count=100, run_duration=5.0, final_status="SUCCEEDED",
+                 host="127.0.0.1", port=0):
+        """
+        Args:
+            items: List of items for every run, or a callable (task_id, run_input) -> list of items
+            item_count: Number of synthetic items per run when items is not given
+            run_duration: Seconds a run takes to write all its items
+            final_status: Status runs end with (e.g. 'FAILED' to test error handling)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.items = items
+        self.item_count = item_count
+        self.run_duration = run_duration
+        self.final_status = final_status
+        self.runs = {}
+        self.datasets = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start_run(self, task_id, run_input):
+        if callable(self.items):
+            items = self.items(task_id, run_input)
+        elif self.items is not None:
+            items = list(self.items)
+        else:
+            items = make_job_items(task_id, self.item_count)
+        run = FakeRun(task_id, run_input, items, self.run_duration, self.final_status)
+        with self._lock:
+            self.runs[run.id] = run
+            self.datasets[run.dataset_id] = run
+        return run
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_found(self):
+                self._send_json({'error': {'type': 'record-not-found', 'message': 'Not found'}}, status=404)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                parts = url.path.strip('/').split('/')
+                server.requests.append(('POST', url.path))
+                if len(parts) == 4 and parts[:2] == ['v2', 'actor-tasks'] and parts[3] == 'runs':
+                    length = int(self.headers.get('Content-Length') or 0)
+                    raw = self.rfile.read(length) if length else b''
+                    run_input = json.loads(raw) if raw else None
+                    run = server.start_run(parts[2], run_input)
+                    self._send_json({'data': run.to_dict()}, status=201)
+                else:
+                    self._not_found()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip('/').split('/')
+                server.requests.append(('GET', url.path))
+
+                if len(parts) == 3 and parts[:2] == ['v2', 'actor-runs']:
+                    run = server.runs.get(parts[2])
+                    if not run:
+                        return self._not_found()
+                    # waitForFinish: hold the request until the run finishes or the wait elapses
+                    deadline = time.time() + float(query.get('waitForFinish', ['0'])[0])
+                    while not run.is_finished() and time.time() < deadline:
+                        time.sleep(0.05)
+                    return self._send_json({'data': run.to_dict()})
+
+                if len(parts) == 4 and parts[:2] == ['v2', 'datasets'] and parts[3] == 'items':
+                    run = server.datasets.get(parts[2])
+                    if not run:
+                        return self._not_found()
+                    items = run.visible_items()
+                    offset = int(query.get('offset', ['0'])[0])
+                    limit = int(query.get('limit', [str(len(items))])[0] or len(items))
+                    page = items[offset:offset + limit]
+                    return self._send_json(page, headers={
+                        'X-Apify-Pagination-Total': str(len(items)),
+                        'X-Apify-Pagination-Offset': str(offset),
+                        'X-Apify-Pagination-Count': str(len(page)),
+                        'X-Apify-Pagination-Limit': str(limit),
+                        'X-Apify-Pagination-Desc': 'false',
+                    })
+
+                self._not_found()
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a local fake Apify API server')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind')
+    parser.add_argument('--items', type=int, default=100, help='Items written per run')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds each run takes')
+    parser.add_argument('--final-status', default='SUCCEEDED', help='Status runs finish with')
+    args = parser.parse_args()
+
+    fake = FakeApifyServer(item_count=args.items, run_duration=args.duration,
+                           final_status=args.final_status, host=args.host, port=args.port)
+    print(f"Fake Apify API listening on {fake.url} (set APIFY_API_URL to use it)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
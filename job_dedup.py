@@ -0,0 +1,284 @@
+import re
+import hashlib
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the MinHash permutations; signature values fit in a BIGINT
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Arbitrary application-wide key for pg_advisory_lock (see migrate.MIGRATION_LOCK_ID)
+DEDUP_LOCK_ID = 4021968
+
+
+def normalize_posting(title, company_name, description):
+    """Normalize the fields that identify a posting (case, punctuation, whitespace)."""
+    text = " | ".join(part or "" for part in (title, company_name, description))
+    text = re.sub(r"<[^>]+>", " ", text.lower())
+    text = re.sub(r"[^\w|]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def content_hash(normalized):
+    """Exact fingerprint of a normalized posting."""
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with LSH banding for candidate lookup."""
+
+    def __init__(self, num_perm=64, bands=16, shingle_size=3, seed=42):
+        """
+        Args:
+            num_perm: Number of hash permutations in a signature
+            bands: Number of LSH bands (num_perm must be divisible by it)
+            shingle_size: Number of words per shingle
+            seed: Seed for the permutation coefficients, fixed so stored signatures stay comparable
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def shingles(self, normalized):
+        """Return the set of word shingles of a normalized text."""
+        words = normalized.split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, normalized):
+        """Compute the MinHash signature of a normalized text."""
+        hashes = [_hash64(shingle) for shingle in self.shingles(normalized)] or [0]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+
+    def band_keys(self, signature):
+        """Return the LSH band keys of a signature; postings sharing any key are candidates."""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(",".join(map(str, rows)).encode("utf-8"), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimate the Jaccard similarity of two postings from their signatures."""
+        if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class JobDeduplicator:
+    """Fingerprints newly inserted jobs and links near-duplicate reposts to an earlier posting.
+
+    Duplicates get duplicate_of set to the canonical job_id; the enrichment stages skip
+    them and copy_from_canonical() fills in the canonical job's keywords, RAG info and
+    analysis instead of calling the LLM again. Duplicates whose canonical job never gets
+    analyzed are handed back to the pipeline by release_orphaned_duplicates().
+    """
+
+    def __init__(self, conn, threshold=0.85, hasher=None, log=None, canonical_timeout_hours=24):
+        """
+        Args:
+            conn: psycopg2 connection
+            threshold: Minimum estimated Jaccard similarity to treat two postings as duplicates
+            hasher: MinHasher to use (defaults to 64 permutations in 16 bands)
+            log: Logging function (defaults to the module logger)
+            canonical_timeout_hours: Hours a duplicate waits for its canonical job's analysis
+                before it is processed on its own
+        """
+        self.conn = conn
+        self.threshold = threshold
+        self.canonical_timeout_hours = canonical_timeout_hours
+        self.hasher = hasher or MinHasher()
+        self.log = log or logger.info
+
+    def deduplicate_new_jobs(self, batch_size=1000):
+        """
+        Fingerprint every job that has no fingerprint yet and flag near-duplicates.
+        Concurrent callers (e.g. several drain workers) are serialized with an advisory
+        lock, so a posting is never compared against a page another worker is still linking.
+
+        Args:
+            batch_size (int): Number of new jobs fingerprinted per round trip
+
+        Returns:
+            int: Number of jobs flagged as duplicates
+        """
+        duplicates = 0
+        after_id = 0
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (DEDUP_LOCK_ID,))
+        self.conn.commit()
+        try:
+            while True:
+                with self.conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT id, job_id, title, company_name, description
+                        FROM jobs
+                        WHERE content_hash IS NULL AND id > %s
+                        ORDER BY id
+                        LIMIT %s
+                    """, (after_id, batch_size))
+                    new_jobs = cur.fetchall()
+                if not new_jobs:
+                    return duplicates
+                duplicates += self._deduplicate_batch(new_jobs)
+                after_id = new_jobs[-1][0]
+        finally:
+            self.conn.rollback()
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (DEDUP_LOCK_ID,))
+            self.conn.commit()
+
+    def _deduplicate_batch(self, new_jobs):
+        """Fingerprint one batch of (id, job_id, title, company_name, description) rows; returns the duplicate count."""
+        from psycopg2.extras import execute_values
+
+        fingerprints = []
+        for row_id, job_id, title, company_name, description in new_jobs:
+            normalized = normalize_posting(title, company_name, description)
+            signature = self.hasher.signature(normalized)
+            fingerprints.append({
+                'id': row_id,
+                'job_id': job_id,
+                'content_hash': content_hash(normalized),
+                'minhash': signature,
+                'lsh_bands': self.hasher.band_keys(signature)
+            })
+
+        # Fetch every already-fingerprinted canonical posting that shares a hash or a band
+        new_ids = [fp['id'] for fp in fingerprints]
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, job_id, content_hash, minhash, lsh_bands,
+                       (gpt_analysis IS NOT NULL)::int + (rag_info IS NOT NULL)::int + (keyword IS NOT NULL)::int
+                FROM jobs
+                WHERE content_hash IS NOT NULL AND duplicate_of IS NULL
+                  AND NOT (id = ANY(%s))
+                  AND (content_hash = ANY(%s) OR lsh_bands && %s)
+            """, (new_ids,
+                  [fp['content_hash'] for fp in fingerprints],
+                  sorted({key for fp in fingerprints for key in fp['lsh_bands']})))
+            candidates = [{
+                'id': row[0], 'job_id': row[1], 'content_hash': row[2],
+                'minhash': list(row[3] or []), 'lsh_bands': row[4] or [], 'enrichment': row[5]
+            } for row in cur.fetchall()]
+
+        # Band index over existing candidates; new jobs are added as they become canonical,
+        # so reposts within the same scrape are linked to the first one seen
+        by_hash, by_band = {}, {}
+        def index(entry):
+            by_hash.setdefault(entry['content_hash'], []).append(entry)
+            for key in entry['lsh_bands']:
+                by_band.setdefault(key, []).append(entry)
+        for entry in candidates:
+            index(entry)
+
+        updates = []
+        duplicates = 0
+        for fp in fingerprints:
+            canonical = self._find_canonical(fp, by_hash, by_band)
+            if canonical:
+                duplicates += 1
+                self.log(f"Job {fp['job_id']} is a near-duplicate of job {canonical['job_id']}")
+            else:
+                fp['enrichment'] = 0
+                index(fp)
+            updates.append((fp['id'], fp['content_hash'], fp['minhash'], fp['lsh_bands'],
+                            canonical['job_id'] if canonical else None))
+
+        with self.conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE jobs
+                SET content_hash = data.content_hash, minhash = data.minhash::bigint[],
+                    lsh_bands = data.lsh_bands::text[], duplicate_of = data.duplicate_of
+                FROM (VALUES %s) AS data (id, content_hash, minhash, lsh_bands, duplicate_of)
+                WHERE jobs.id = data.id
+            """, updates)
+        self.conn.commit()
+        return duplicates
+
+    def _find_canonical(self, fp, by_hash, by_band):
+        """Pick the best matching canonical posting: exact match first, then the most enriched near-duplicate."""
+        exact = by_hash.get(fp['content_hash'])
+        if exact:
+            return max(exact, key=lambda entry: (entry['enrichment'], -entry['id']))
+
+        seen = set()
+        matches = []
+        for key in fp['lsh_bands']:
+            for entry in by_band.get(key, []):
+                if entry['job_id'] in seen:
+                    continue
+                seen.add(entry['job_id'])
+                if self.hasher.similarity(fp['minhash'], entry['minhash']) >= self.threshold:
+                    matches.append(entry)
+        if not matches:
+            return None
+        return max(matches, key=lambda entry: (entry['enrichment'], -entry['id']))
+
+    def copy_from_canonical(self):
+        """
+        Copy keywords, RAG info and analysis from canonical postings to their duplicates.
+
+        Returns:
+            int: Number of duplicate rows updated
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE jobs AS dup
+                SET keyword = COALESCE(dup.keyword, canon.keyword),
+                    rag_info = COALESCE(dup.rag_info, canon.rag_info),
+                    gpt_analysis = COALESCE(dup.gpt_analysis, canon.gpt_analysis),
+                    is_best_fit = CASE WHEN dup.gpt_analysis IS NULL THEN canon.is_best_fit ELSE dup.is_best_fit END,
+                    score = CASE WHEN dup.gpt_analysis IS NULL THEN canon.score ELSE dup.score END
+                FROM jobs AS canon
+                WHERE dup.duplicate_of = canon.job_id
+                  AND ((dup.keyword IS NULL AND canon.keyword IS NOT NULL)
+                    OR (dup.rag_info IS NULL AND canon.rag_info IS NOT NULL)
+                    OR (dup.gpt_analysis IS NULL AND canon.gpt_analysis IS NOT NULL))
+            """)
+            updated = cur.rowcount
+        self.conn.commit()
+        return updated
+
+    def release_orphaned_duplicates(self):
+        """
+        Clear duplicate_of on duplicates that would otherwise wait forever, so they go
+        through the normal pipeline: those whose canonical job no longer exists (or is
+        itself a duplicate), and those still unanalyzed after canonical_timeout_hours
+        whose canonical job has no analysis and is not being worked on.
+
+        Returns:
+            int: Number of duplicates released
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE jobs AS dup
+                SET duplicate_of = NULL
+                WHERE dup.duplicate_of IS NOT NULL
+                  AND dup.gpt_analysis IS NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM jobs AS canon
+                      WHERE canon.job_id = dup.duplicate_of
+                        AND canon.duplicate_of IS NULL
+                        AND (canon.gpt_analysis IS NOT NULL
+                          OR dup.created_at >= now() - make_interval(hours => %s)
+                          OR canon.claimed_until >= now())
+                  )
+            """, (self.canonical_timeout_hours,))
+            released = cur.rowcount
+        self.conn.commit()
+        return released
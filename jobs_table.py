@@ -0,0 +1,220 @@
+import io
+import csv
+import logging
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+# Scraped columns of the jobs table and the Apify item fields they come from
+JOB_FIELDS = {
+    'job_id': 'id',
+    'title': 'title',
+    'company_name': 'companyName',
+    'company_url': 'companyUrl',
+    'location': 'location',
+    'job_url': 'jobUrl',
+    'apply_url': 'applyUrl',
+    'apply_type': 'applyType',
+    'experience_level': 'experienceLevel',
+    'sector': 'sector',
+    'work_type': 'workType',
+    'contract_type': 'contractType',
+    'salary': 'salary',
+    'benefits': 'benefits',
+    'applications_count': 'applicationsCount',
+    'description': 'description',
+    'description_html': 'descriptionHtml',
+    'company_id': 'companyId',
+    'poster_profile_url': 'posterProfileUrl',
+    'poster_full_name': 'posterFullName',
+    'published_at': 'publishedAt',
+    'posted_time': 'postedTime',
+}
+JOB_COLUMNS = tuple(JOB_FIELDS)
+
+
+def job_row(item):
+    """
+    Map an Apify job item to a tuple of JOB_COLUMNS values.
+
+    Returns:
+        tuple: Column values, or None if the item has no job ID
+    """
+    if not isinstance(item, dict) or not item.get('id'):
+        return None
+    row = []
+    for column, field in JOB_FIELDS.items():
+        value = item.get(field)
+        if isinstance(value, (list, dict)):
+            value = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+        elif value is not None and not isinstance(value, str):
+            value = str(value)
+        row.append(value or None)
+    return tuple(row)
+
+
+def _unique_rows(items):
+    """Map items to rows, keeping the last occurrence of each job ID (ON CONFLICT cannot touch a row twice)."""
+    rows = {}
+    for item in items:
+        row = job_row(item)
+        if row is not None:
+            rows[row[0]] = row
+    return list(rows.values())
+
+
+def upsert_jobs(conn, items, page_size=500):
+    """
+    Insert scraped jobs, updating the scraped columns of jobs that already exist.
+    Enrichment columns (keywords, RAG info, analysis) are left untouched.
+
+    Args:
+        conn: psycopg2 connection (the caller commits)
+        items: Iterable of Apify job items
+        page_size (int): Rows per INSERT statement
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = _unique_rows(items)
+    if not rows:
+        return 0
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in JOB_COLUMNS if column != 'job_id')
+    with conn.cursor() as cur:
+        execute_values(cur, f"""
+            INSERT INTO jobs ({", ".join(JOB_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (job_id) DO UPDATE SET {updates}
+        """, rows, page_size=page_size)
+    return len(rows)
+
+
+def _ensure_staging_table(cur, columns):
+    """Create the session's jobs_staging table unless it already exists (it lives as long as the connection)."""
+    cur.execute("SELECT to_regclass('pg_temp.jobs_staging')")
+    if cur.fetchone()[0] is not None:
+        return
+    cur.execute(f"CREATE TEMP TABLE jobs_staging AS SELECT {columns} FROM jobs WITH NO DATA")
+    # Staged rows are read once, so don't spend time compressing the long text columns
+    for column in ('description', 'description_html'):
+        cur.execute(f"ALTER TABLE jobs_staging ALTER COLUMN {column} SET STORAGE EXTERNAL")
+
+
+def copy_upsert_jobs(conn, items):
+    """
+    Bulk upsert scraped jobs by streaming them into a temporary staging table with
+    COPY FROM STDIN and merging them into jobs with a single INSERT ... ON CONFLICT.
+
+    Args:
+        conn: psycopg2 connection (the caller commits; the staging table is created once
+              per connection and emptied after every merge)
+        items: Iterable of Apify job items
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = _unique_rows(items)
+    if not rows:
+        return 0
+
+    # CSV handles embedded newlines and quotes. csv.writer writes None and '' the same way (an
+    # empty field, which COPY reads as NULL); job_row already maps '' to None, so nothing is lost
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    buffer.seek(0)
+
+    columns = ", ".join(JOB_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in JOB_COLUMNS if column != 'job_id')
+    with conn.cursor() as cur:
+        _ensure_staging_table(cur, columns)
+        cur.copy_expert(f"COPY jobs_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute(f"""
+            INSERT INTO jobs ({columns})
+            SELECT {columns} FROM jobs_staging
+            ON CONFLICT (job_id) DO UPDATE SET {updates}
+        """)
+        cur.execute("TRUNCATE jobs_staging")
+    return len(rows)
+
+
+# Upsert implementations selectable for ingestion
+UPSERT_METHODS = {
+    'copy': copy_upsert_jobs,
+    'values': upsert_jobs,
+}
+
+
+def bulk_update(conn, columns, rows, types=None, key='job_id', page_size=1000):
+    """
+    Update many jobs with one UPDATE ... FROM (VALUES ...) per page of rows.
+
+    Args:
+        conn: psycopg2 connection (the caller commits)
+        columns: Names of the columns to set
+        rows: Sequence of tuples (key value, *column values)
+        types: Optional mapping of column name to SQL type, needed for columns that
+               may be all NULL in a page (e.g. {'score': 'numeric'})
+        key (str): Column identifying the row to update
+        page_size (int): Rows per UPDATE statement
+
+    Returns:
+        int: Number of rows updated
+    """
+    if not rows:
+        return 0
+    types = types or {}
+    template = "(" + ", ".join(
+        ["%s"] + [f"%s::{types[column]}" if column in types else "%s" for column in columns]
+    ) + ")"
+    assignments = ", ".join(f"{column} = data.{column}" for column in columns)
+    updated = 0
+    with conn.cursor() as cur:
+        for start in range(0, len(rows), page_size):
+            execute_values(cur, f"""
+                UPDATE jobs
+                SET {assignments}
+                FROM (VALUES %s) AS data ({key}, {", ".join(columns)})
+                WHERE jobs.{key} = data.{key}
+            """, rows[start:start + page_size], template=template, page_size=page_size)
+            updated += cur.rowcount
+    return updated
+
+
+def ingest_pages(conn, pages, log=None, method='values', watermark=None):
+    """
+    Upsert pages of Apify items as they arrive, committing after each page so
+    memory stays bounded by one page.
+
+    Args:
+        conn: psycopg2 connection
+        pages: Iterable of lists of Apify job items
+        log: Logging function for per-page progress (defaults to the module logger)
+        method (str): Upsert implementation, 'values' (execute_values) or 'copy' (COPY into a staging table)
+        watermark: Optional ScrapeWatermark (or MultiTaskScraper); known items are skipped
+                   and the watermark advances after each committed page
+
+    Returns:
+        int: Total number of rows written
+    """
+    log = log or logger.info
+    upsert = UPSERT_METHODS[method]
+    total = 0
+    for page_number, items in enumerate(pages, 1):
+        page_items = len(items)
+        if watermark is not None:
+            items = watermark.filter_new(items)
+        try:
+            written = upsert(conn, items)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if watermark is not None:
+            watermark.record(items)
+        total += written
+        log(f"Page {page_number}: upserted {written} of {page_items} items ({total} jobs so far)")
+    if watermark is not None:
+        watermark.save()
+        log(f"Skipped {watermark.skipped} already known items (watermark {watermark.last_published_at})")
+    return total
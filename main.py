@@ -4,19 +4,27 @@ from datetime import datetime
 import os
 import json
 from dotenv import load_dotenv
-from process_jobs_rag import JobProcessor
+from process_jobs_rag import JobProcessor, get_shared_rag
 from email_service import EmailService
 import traceback
 
 load_dotenv()
 
+def _get_rag():
+    """Return the shared RAG instance, or None if it cannot be created."""
+    try:
+        return get_shared_rag()
+    except Exception as e:
+        print(f"Error initializing PersonalRAG: {str(e)}")
+        return None
+
 def process_jobs():
     """Process jobs using the complete workflow."""
     print(f"Starting job processing at {datetime.now()}")
     
     try:
-        # Initialize the job processor
-        processor = JobProcessor()
+        # Initialize the job processor, reusing the warm RAG instance across runs
+        processor = JobProcessor(rag=_get_rag())
         
         # Run the complete workflow
         processor.process_jobs()
@@ -44,6 +52,12 @@ def main():
     if next_run:
         print(f"Next scheduled run: {next_run}")
     
+    # Optionally load models and connect to Milvus now instead of on the first run
+    if os.getenv('RAG_WARMUP_ON_START', '').lower() == 'true':
+        rag = _get_rag()
+        if rag:
+            rag.warmup()
+    
     # Optional: Uncomment to run immediately on startup
     # process_jobs()
     
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Apply versioned schema migrations to the jobs database.
+
+Migrations are SQL files in migrations/ named NNN_description.sql. Each one runs in
+its own transaction and is recorded in the schema_migrations table, so every file
+is applied exactly once, in version order. Concurrent runners (e.g. several drain
+workers starting at once) are serialized with an advisory lock.
+
+Usage:
+    python migrate.py            # Apply pending migrations
+    python migrate.py --status   # List applied and pending migrations
+"""
+
+import os
+import re
+import logging
+import argparse
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 4021967
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """
+    Read the migration files of a directory.
+
+    Returns:
+        list: (version, name, sql) tuples ordered by version
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def applied_versions(conn):
+    """Return the set of migration versions recorded in the database."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations')")
+        if cur.fetchone()[0] is None:
+            versions = set()
+        else:
+            cur.execute("SELECT version FROM schema_migrations")
+            versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR, log=None):
+    """
+    Apply every migration that has not been applied yet.
+
+    Args:
+        conn: psycopg2 connection
+        directory: Directory holding the migration files
+        log: Logging function (defaults to the module logger)
+
+    Returns:
+        list: Versions applied by this call
+    """
+    log = log or logger.info
+    migrations = load_migrations(directory)
+    done = applied_versions(conn)
+    if all(version in done for version, _, _ in migrations):
+        return []
+
+    applied = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+    try:
+        # Another runner may have applied some migrations while we waited for the lock
+        done = applied_versions(conn)
+        for version, name, sql in migrations:
+            if version in done:
+                continue
+            log(f"Applying migration {version:03d}_{name}")
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(version)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+    return applied
+
+
+def main():
+    from dotenv import load_dotenv
+    from db_pool import get_pool
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Apply schema migrations to the jobs database')
+    parser.add_argument('--status', action='store_true', help='List applied and pending migrations')
+    args = parser.parse_args()
+
+    with get_pool().connection() as conn:
+        if args.status:
+            done = applied_versions(conn)
+            for version, name, _ in load_migrations():
+                status = "applied" if version in done else "pending"
+                print(f"{version:03d}_{name:<32} {status}")
+            return
+
+        applied = apply_migrations(conn)
+        if applied:
+            print(f"Applied {len(applied)} migrations")
+        else:
+            print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
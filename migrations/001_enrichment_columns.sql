@@ -0,0 +1,18 @@
+-- Columns added to the jobs table over time by the processing pipeline.
+-- Tables created from an older create_table.sql lack some of them.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS keyword TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS rag_info TEXT;
+
+-- Duplicate detection (reposts reuse the enrichment of the canonical job)
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash BIGINT[];
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS lsh_bands TEXT[];
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS duplicate_of TEXT;
+CREATE INDEX IF NOT EXISTS idx_content_hash ON jobs(content_hash);
+CREATE INDEX IF NOT EXISTS idx_lsh_bands ON jobs USING GIN (lsh_bands);
+CREATE INDEX IF NOT EXISTS idx_duplicate_of ON jobs(duplicate_of);
+
+-- Work queue leases
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP;
@@ -0,0 +1,28 @@
+-- Explicit pipeline state, derived from the enrichment columns so it can never drift.
+-- Analyzed jobs only wait for a score; duplicates are filled from their canonical job.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS pipeline_state TEXT GENERATED ALWAYS AS (
+    CASE
+        WHEN gpt_analysis IS NOT NULL THEN
+            CASE WHEN score IS NULL THEN 'needs_score' ELSE 'done' END
+        WHEN duplicate_of IS NOT NULL THEN 'duplicate'
+        WHEN keyword IS NULL THEN 'needs_keywords'
+        WHEN rag_info IS NULL THEN 'needs_rag'
+        ELSE 'needs_analysis'
+    END
+) STORED;
+
+-- One small partial index per pending state; finished jobs are not indexed at all
+CREATE INDEX IF NOT EXISTS idx_pipeline_needs_keywords ON jobs(id) WHERE pipeline_state = 'needs_keywords';
+CREATE INDEX IF NOT EXISTS idx_pipeline_needs_rag ON jobs(id) WHERE pipeline_state = 'needs_rag';
+CREATE INDEX IF NOT EXISTS idx_pipeline_needs_analysis ON jobs(id) WHERE pipeline_state = 'needs_analysis';
+CREATE INDEX IF NOT EXISTS idx_pipeline_needs_score ON jobs(id) WHERE pipeline_state = 'needs_score';
+
+-- Work queue claims over any subset of the enrichment states (state and lease columns included for index-only lookups)
+CREATE INDEX IF NOT EXISTS idx_pipeline_work_queue ON jobs(id) INCLUDE (pipeline_state, claimed_until)
+    WHERE pipeline_state IN ('needs_keywords', 'needs_rag', 'needs_analysis');
+
+-- Jobs waiting to be fingerprinted by the deduplicator
+CREATE INDEX IF NOT EXISTS idx_unfingerprinted ON jobs(id) WHERE content_hash IS NULL;
+
+-- Newsletter: recent jobs ranked by score
+CREATE INDEX IF NOT EXISTS idx_created_at_score ON jobs(created_at, score DESC NULLS LAST);
@@ -0,0 +1,44 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _load_once(key, loader):
+    """Load a model with the given loader the first time it is requested, then reuse it."""
+    if key in _models:
+        return _models[key]
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _models:
+            logger.info(f"Loading {key[0]} model: {key[1]}")
+            _models[key] = loader()
+    return _models[key]
+
+
+def get_clip(model_id="openai/clip-vit-base-patch32"):
+    """Return the process-wide (model, processor) pair for a CLIP checkpoint, loading it on first use."""
+    def load():
+        from transformers import CLIPModel, CLIPProcessor
+        model = CLIPModel.from_pretrained(model_id)
+        model.eval()
+        return model, CLIPProcessor.from_pretrained(model_id)
+
+    return _load_once(("clip", model_id), load)
+
+
+def is_loaded(kind, model_id):
+    """Return True if the given model has already been loaded in this process."""
+    return (kind, model_id) in _models
+
+
+def clear():
+    """Drop all loaded models (mainly useful to free memory)."""
+    with _registry_lock:
+        _models.clear()
+        _locks.clear()
@@ -0,0 +1,169 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class TaskReport:
+    """Timing and outcome of one Apify task in a multi-task scrape."""
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.pages = 0
+        self.items = 0
+        self.new_items = 0
+        self.duplicates = 0
+        self.seconds = None
+        self.error = None
+
+    def __str__(self):
+        status = f"FAILED ({self.error})" if self.error else "ok"
+        seconds = f"{self.seconds:.1f}s" if self.seconds is not None else "running"
+        return (f"Task {self.task_id}: {status}, {seconds}, {self.pages} pages, {self.items} items, "
+                f"{self.new_items} new, {self.duplicates} duplicates of other tasks")
+
+
+class MultiTaskScraper:
+    """Runs several Apify tasks concurrently and merges their items into one page stream.
+
+    Each task runs in its own worker thread and hands its pages to a bounded queue,
+    so a slow scrape never holds back the pages of the others and memory stays
+    bounded. Items are deduplicated by job ID across tasks (the first task to deliver
+    a job keeps it). The scraper also exposes the watermark interface used by
+    jobs_table.ingest_pages, routing committed items to their task's watermark.
+    """
+
+    def __init__(self, apify, tasks, page_size=500, max_concurrency=3, watermarks=None, queue_size=8):
+        """
+        Args:
+            apify: ApifyWrapper used to run the tasks
+            tasks: List of {"task_id": ..., "input": {...}} task configurations
+            page_size: Dataset items per page
+            max_concurrency: Maximum number of tasks running at the same time
+            watermarks: Optional mapping of task ID to ScrapeWatermark for incremental scraping
+            queue_size: Maximum number of pages buffered between the tasks and the consumer
+        """
+        self.apify = apify
+        self.tasks = tasks
+        self.page_size = page_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.watermarks = watermarks or {}
+        self.reports = {task['task_id']: TaskReport(task['task_id']) for task in tasks}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._owners = {}
+        self._committed = set()
+        self._pending_duplicates = {}
+
+    def iter_pages(self):
+        """Yield merged, deduplicated pages of new items as the tasks produce them."""
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(self.tasks)) or 1)
+        try:
+            for task in self.tasks:
+                executor.submit(self._run_task, task)
+
+            running = len(self.tasks)
+            while running:
+                task_id, items = self._queue.get()
+                if items is None:
+                    running -= 1
+                    continue
+
+                report = self.reports[task_id]
+                merged = []
+                for item in items:
+                    job_id = str(item.get('id'))
+                    owner = self._owners.setdefault(job_id, task_id)
+                    if owner != task_id:
+                        report.duplicates += 1
+                        self._record_duplicate(task_id, job_id, item)
+                        continue
+                    merged.append(item)
+                report.new_items += len(merged)
+                if merged:
+                    yield merged
+        finally:
+            # Unblock and stop the workers if the consumer stops early
+            self._stop.set()
+            executor.shutdown(wait=False)
+
+    def _run_task(self, task):
+        """Run one task and feed its pages into the queue."""
+        task_id = task['task_id']
+        report = self.reports[task_id]
+        watermark = self.watermarks.get(task_id)
+        start = time.monotonic()
+        try:
+            task_input = dict(task.get('input') or {})
+            if watermark is not None:
+                task_input.update(watermark.actor_input() or {})
+
+            for items in self.apify.iter_task_pages(task_id, self.page_size, task_input or None):
+                if self._stop.is_set():
+                    return
+                report.pages += 1
+                report.items += len(items)
+                if watermark is not None:
+                    items = watermark.filter_new(items)
+                self._put((task_id, items))
+        except Exception as e:
+            report.error = str(e)
+            logger.error(f"Apify task {task_id} failed: {str(e)}")
+        finally:
+            report.seconds = time.monotonic() - start
+            self._put((task_id, None))
+
+    def _put(self, entry):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(entry, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    # Watermark interface for jobs_table.ingest_pages; items are already filtered per task
+
+    @property
+    def skipped(self):
+        return sum(watermark.skipped for watermark in self.watermarks.values())
+
+    @property
+    def last_published_at(self):
+        marks = [watermark.last_published_at for watermark in self.watermarks.values() if watermark.last_published_at]
+        return max(marks) if marks else None
+
+    def filter_new(self, items):
+        return items
+
+    def record(self, items):
+        """Advance the watermarks of the tasks that delivered each item once its page is committed."""
+        by_task = {}
+        for item in items:
+            job_id = str(item.get('id'))
+            self._committed.add(job_id)
+            deliveries = [(self._owners.get(job_id), item)] + self._pending_duplicates.pop(job_id, [])
+            for task_id, delivered in deliveries:
+                if task_id in self.watermarks:
+                    by_task.setdefault(task_id, []).append(delivered)
+        for task_id, task_items in by_task.items():
+            self.watermarks[task_id].record(task_items)
+
+    def _record_duplicate(self, task_id, job_id, item):
+        """Mark a job delivered by a second task as seen for that task once the first copy is stored."""
+        if task_id not in self.watermarks:
+            return
+        if job_id in self._committed:
+            self.watermarks[task_id].record([item])
+        else:
+            self._pending_duplicates.setdefault(job_id, []).append((task_id, item))
+
+    def save(self):
+        for watermark in self.watermarks.values():
+            watermark.save()
+
+    def report_lines(self):
+        """Return one summary line per task."""
+        return [str(self.reports[task['task_id']]) for task in self.tasks]
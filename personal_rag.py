@@ -1,16 +1,7 @@
 import os
-from typing import List, Dict, Any, Optional, Literal, Union
-import torch
-from transformers import CLIPProcessor, CLIPModel, AutoModelForCausalLM, AutoTokenizer
+from typing import List, Dict, Any, Optional, Literal
 import numpy as np
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import HuggingFacePipeline
-from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
 from dotenv import load_dotenv
-from pymilvus import connections, Collection, utility
-import anthropic
 import argparse
 import subprocess
 import importlib.util
@@ -18,7 +9,13 @@ import json
 import functools
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from scheduling import StageTimer, map_concurrently
+from rag_cache import EmbeddingCache, ResultCache, normalize_query
+from bm25_index import BM25Index
+import model_registry
 
 # Setup logging
 logging.basicConfig(
@@ -38,6 +35,15 @@ class QueryMethod(str, Enum):
     HYBRID = "hybrid"      # Combination of semantic and keyword search
 
 
+class RetrievedHit:
+    """Search hit produced outside Milvus, exposing the same id/score/entity interface as a Milvus hit."""
+    
+    def __init__(self, id: Any, score: float, entity: Dict[str, Any]):
+        self.id = id
+        self.score = score
+        self.entity = entity
+
+
 def with_milvus_recovery(max_attempts=3):
     """Decorator to handle Milvus connection issues by automatically restarting containers when needed.
     
@@ -94,18 +100,122 @@ class PersonalRAG:
         # Load configuration if provided
         self.config = self._load_config(config_file)
         
-        # Initialize CLIP for query embedding
-        self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-        self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+        # CLIP for query embedding, Milvus and the LLM client are all set up lazily on first use
+        self.clip_model_id = "openai/clip-vit-base-patch32"
+        self._collection = None
+        self._llm = None
+        self._llm_ready = False
+        self._setup_lock = threading.RLock()
         
-        # Initialize Milvus connection
-        self.setup_milvus()
+        # Cache query embeddings across runs (keyed by normalized text and model ID)
+        cache_config = self.config.get("embedding_cache", {})
+        if cache_config.get("enabled", True):
+            self.embedding_cache = EmbeddingCache(
+                path=cache_config.get("path"),
+                model_id=self.clip_model_id,
+                max_memory_entries=cache_config.get("max_memory_entries", 2048),
+                max_disk_entries=cache_config.get("max_disk_entries", 100000)
+            )
+        else:
+            self.embedding_cache = None
         
-        # Initialize LLM based on type
-        self.setup_llm()
+        # Cache retrieval results until the collection changes
+        result_cache_config = self.config.get("result_cache", {})
+        if result_cache_config.get("enabled", True):
+            self.result_cache = ResultCache(
+                version_fn=self._collection_version,
+                max_entries=result_cache_config.get("max_entries", 512),
+                ttl_seconds=result_cache_config.get("ttl_seconds", 3600),
+                version_check_interval=result_cache_config.get("version_check_interval", 30)
+            )
+        else:
+            self.result_cache = None
+        
+        # Reassembled full documents, dropped together with the result cache when the collection changes
+        document_cache_config = self.config.get("document_cache", {})
+        if document_cache_config.get("enabled", True):
+            self.document_cache = ResultCache(
+                version_fn=self._collection_version,
+                max_entries=document_cache_config.get("max_entries", 128),
+                ttl_seconds=document_cache_config.get("ttl_seconds", 86400),
+                version_check_interval=result_cache_config.get("version_check_interval", 30)
+            )
+        else:
+            self.document_cache = None
         
         # Dialog memory
         self.dialog_memory = []
+        
+        # Per-stage retrieval timings (embedding vs. Milvus search)
+        self.timings = StageTimer()
+        
+        # BM25 index for keyword search, loaded or built on first use
+        self.keyword_index = None
+        self.keyword_index_refreshed_at = 0.0
+        self.keyword_index_lock = threading.Lock()
+
+    @property
+    def clip_model(self):
+        """Shared CLIP model, loaded on first use."""
+        return model_registry.get_clip(self.clip_model_id)[0]
+
+    @property
+    def clip_processor(self):
+        """Shared CLIP processor, loaded on first use."""
+        return model_registry.get_clip(self.clip_model_id)[1]
+
+    @property
+    def collection(self):
+        """The personal_rag Milvus collection, connected and loaded on first use."""
+        if self._collection is None:
+            with self._setup_lock:
+                if self._collection is None:
+                    self.setup_milvus()
+        return self._collection
+
+    @collection.setter
+    def collection(self, value):
+        self._collection = value
+
+    @property
+    def llm(self):
+        """The LLM client, created on first use."""
+        if not self._llm_ready:
+            with self._setup_lock:
+                if not self._llm_ready:
+                    self.setup_llm()
+                    self._llm_ready = True
+        return self._llm
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+
+    def warmup(self) -> Dict[str, float]:
+        """
+        Eagerly load everything a query needs: the CLIP model, the Milvus collection
+        and, for keyword or hybrid search, the BM25 index.
+        
+        Returns:
+            Dictionary mapping each warmed-up component to the seconds it took
+        """
+        timings = {}
+        
+        start = time.perf_counter()
+        self.generate_query_embeddings(["warmup"])
+        timings["clip"] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        _ = self.collection
+        timings["milvus"] = time.perf_counter() - start
+        
+        if self.query_method in [QueryMethod.KEYWORD, QueryMethod.HYBRID]:
+            start = time.perf_counter()
+            self._get_keyword_index()
+            timings["keyword_index"] = time.perf_counter() - start
+        
+        logger.info("PersonalRAG warmed up: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
+        return timings
 
     def _load_config(self, config_file: Optional[str] = None) -> Dict[str, Any]:
         """Load configuration from file or use defaults."""
@@ -117,12 +227,38 @@ class PersonalRAG:
                 "limit": 7
             },
             "keyword_search": {
-                "limit": 7
+                "limit": 7,
+                "index_path": os.getenv("BM25_INDEX_PATH", "cache/bm25_index.json"),
+                "refresh_interval": 300
             },
             "hybrid_search": {
                 "semantic_weight": 0.7,
                 "keyword_weight": 0.3,
-                "limit": 7
+                "limit": 7,
+                "fusion": "rrf",
+                "rrf_k": 60,
+                "candidate_depth": 20
+            },
+            "embedding": {
+                "batch_size": 32
+            },
+            "embedding_cache": {
+                "enabled": True,
+                "path": os.getenv("EMBEDDING_CACHE_PATH", "cache/query_embeddings.sqlite"),
+                "max_memory_entries": 2048,
+                "max_disk_entries": 100000
+            },
+            "result_cache": {
+                "enabled": True,
+                "max_entries": 512,
+                "ttl_seconds": 3600,
+                "version_check_interval": 30,
+                "version_marker": os.getenv("RAG_COLLECTION_VERSION", "")
+            },
+            "document_cache": {
+                "enabled": True,
+                "max_entries": 128,
+                "ttl_seconds": 86400
             }
         }
         
@@ -156,19 +292,29 @@ class PersonalRAG:
     @with_milvus_recovery(max_attempts=3)
     def setup_milvus(self):
         """Setup Milvus connection and load collection."""
+        from pymilvus import Collection, utility
+        
         self._ensure_milvus_connection()
         
         if not utility.has_collection("personal_rag"):
             raise ValueError("Milvus collection 'personal_rag' does not exist. Please run data ingestion first.")
         
-        self.collection = Collection("personal_rag")
-        self.collection.load()
+        collection = Collection("personal_rag")
+        collection.load()
+        self._collection = collection
         
         # Verify schema compatibility
         self._verify_schema_compatibility()
 
+    def _collection_version(self):
+        """Return a value that changes whenever the personal_rag collection changes."""
+        marker = self.config.get("result_cache", {}).get("version_marker", "")
+        return (self.collection.num_entities, marker)
+
     def _ensure_milvus_connection(self):
         """Ensure Milvus connection is active."""
+        from pymilvus import connections
+        
         try:
             # Try to check connection by getting server version
             if not connections.has_connection("default"):
@@ -314,6 +460,9 @@ class PersonalRAG:
 
     def setup_llm(self):
         """Setup LLM based on the specified type."""
+        # LLM client libraries are heavy, so they are only imported when an LLM is needed
+        from langchain_openai import ChatOpenAI
+        
         if self.llm_type == "llama4":
             try:
                 # Check if model info file exists
@@ -393,6 +542,7 @@ class PersonalRAG:
                 raise ValueError("Anthropic API key required for Claude models")
                 
             # Initialize Anthropic client
+            import anthropic
             self.anthropic_client = anthropic.Anthropic(api_key=self.anthropic_api_key)
             self.using_local_model = False
             print("Using Anthropic Claude Sonnet model")
@@ -422,17 +572,80 @@ class PersonalRAG:
 
     def generate_query_embedding(self, query: str) -> np.ndarray:
         """Generate CLIP embedding for the query."""
-        # Process the query with CLIP
-        inputs = self.clip_processor(text=query, return_tensors="pt", padding=True, truncation=True, max_length=77)
-        with torch.no_grad():
-            text_features = self.clip_model.get_text_features(**inputs)
+        return self.generate_query_embeddings([query])[0]
+
+    def generate_query_embeddings(self, queries: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Generate CLIP embeddings for several queries using padded batches.
+        
+        Args:
+            queries: Query strings to encode
+            batch_size: Number of queries per forward pass (defaults to the configured batch size)
+            
+        Returns:
+            Float32 array of shape (len(queries), embedding_dim)
+        """
+        if batch_size is None:
+            batch_size = self.config.get("embedding", {}).get("batch_size", 32)
+        batch_size = max(1, int(batch_size))
+        
+        embeddings = [None] * len(queries)
         
-        # Ensure the embedding is a 1D array
-        embedding = text_features.detach().numpy()
-        if embedding.ndim > 1:
-            embedding = embedding.squeeze()
+        # Serve repeated queries from the cache and only encode each distinct miss once
+        pending = {}
+        for index, query in enumerate(queries):
+            cached = self.embedding_cache.get(query) if self.embedding_cache else None
+            if cached is not None:
+                embeddings[index] = cached
+            else:
+                pending.setdefault(normalize_query(query), []).append(index)
+        
+        misses = list(pending.items())
+        if misses:
+            # torch is only needed (and imported) when something actually has to be encoded
+            import torch
+        
+        for start in range(0, len(misses), batch_size):
+            batch = misses[start:start + batch_size]
+            texts = [queries[indices[0]] for _, indices in batch]
+            inputs = self.clip_processor(text=texts, return_tensors="pt", padding=True, truncation=True, max_length=77)
+            with torch.no_grad():
+                text_features = self.clip_model.get_text_features(**inputs)
+            features = text_features.detach().cpu().numpy().astype(np.float32, copy=False)
             
-        return embedding
+            for (_, indices), text, embedding in zip(batch, texts, features):
+                if self.embedding_cache:
+                    self.embedding_cache.put(text, embedding)
+                for index in indices:
+                    embeddings[index] = embedding
+        
+        if not embeddings:
+            return np.zeros((0, self.clip_model.config.projection_dim), dtype=np.float32)
+        return np.stack(embeddings).astype(np.float32, copy=False)
+
+    def _search_params(self, k: int) -> Dict[str, Dict[str, Any]]:
+        """Return copies of the configured search parameters with the limit overridden by k."""
+        params = {
+            "semantic": dict(self.config.get("semantic_search", {})),
+            "keyword": dict(self.config.get("keyword_search", {})),
+            "hybrid": dict(self.config.get("hybrid_search", {}))
+        }
+        
+        # Override limit with k parameter if provided
+        if k != 10:
+            for method_params in params.values():
+                method_params["limit"] = k
+        return params
+
+    def _retrieve(self, question: str, params: Dict[str, Dict[str, Any]],
+                  query_embedding: Optional[np.ndarray] = None) -> List[Any]:
+        """Run the configured search method for a single question."""
+        if self.query_method == QueryMethod.SEMANTIC:
+            return self._semantic_search(question, params["semantic"], query_embedding=query_embedding)
+        elif self.query_method == QueryMethod.KEYWORD:
+            return self._keyword_search(question, params["keyword"])
+        else:  # HYBRID
+            return self._hybrid_search(question, params["hybrid"], query_embedding=query_embedding)
 
     @with_milvus_recovery(max_attempts=3)
     def query(self, question: str, k: int = 10, return_full_docs: bool = False) -> Dict[str, Any]:
@@ -447,68 +660,92 @@ class PersonalRAG:
         Returns:
             Dictionary containing the question, raw chunks as answer, and sources
         """
-        # Get search parameters from config
-        semantic_params = self.config.get("semantic_search", {})
-        keyword_params = self.config.get("keyword_search", {})
-        hybrid_params = self.config.get("hybrid_search", {})
+        cache_key = ResultCache.key(question, self.query_method.value, k, return_full_docs)
+        if self.result_cache:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                cached["question"] = question
+                return cached
         
-        # Override limit with k parameter if provided
-        if k != 10:
-            semantic_params["limit"] = k
-            keyword_params["limit"] = k
-            hybrid_params["limit"] = k
+        results = self._retrieve(question, self._search_params(k))
+        result = self._build_result(question, results, return_full_docs)
+        
+        if self.result_cache:
+            self.result_cache.put(cache_key, result)
+        return result
+
+    @with_milvus_recovery(max_attempts=3)
+    def query_many(self, questions: List[str], k: int = 10, return_full_docs: bool = False,
+                   max_workers: int = 1, rate_limiter: Any = None) -> List[Dict[str, Any]]:
+        """
+        Query the RAG system with several questions, encoding them in batches.
+        
+        Args:
+            questions: The questions to ask
+            k: Number of results to retrieve from Milvus per question
+            return_full_docs: Whether to return full documents instead of chunks
+            max_workers: Number of searches to run concurrently (keyword/hybrid methods)
+            rate_limiter: Optional TokenBucket acquired before each Milvus request
+            
+        Returns:
+            List of result dictionaries (same shape as query()) in input order, None for failed questions
+        """
+        questions = list(questions)
+        results = [None] * len(questions)
+        
+        # Serve questions answered earlier against the same collection version from the cache
+        cache_keys = [ResultCache.key(q, self.query_method.value, k, return_full_docs) for q in questions]
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            cached = self.result_cache.get(cache_key) if self.result_cache else None
+            if cached is not None:
+                cached["question"] = questions[index]
+                results[index] = cached
+            else:
+                pending.append(index)
+        
+        if not pending:
+            return results
+        
+        params = self._search_params(k)
+        pending_questions = [questions[index] for index in pending]
+        
+        # Keyword search does not use embeddings, so only encode for the other methods
+        embeddings = [None] * len(pending_questions)
+        if self.query_method != QueryMethod.KEYWORD:
+            with self.timings.stage('embed_batch'):
+                embeddings = self.generate_query_embeddings(pending_questions)
         
-        # Perform search based on query method
         if self.query_method == QueryMethod.SEMANTIC:
-            results = self._semantic_search(question, semantic_params)
-        elif self.query_method == QueryMethod.KEYWORD:
-            results = self._keyword_search(question, keyword_params)
-        else:  # HYBRID
-            results = self._hybrid_search(question, hybrid_params)
+            # One multi-vector search for the whole batch instead of one round trip per question
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            hits_per_query = self._semantic_search_many(embeddings, params["semantic"])
+            searched = [(position, [hits], None) for position, hits in enumerate(hits_per_query)]
+        else:
+            def search(position):
+                return self._retrieve(pending_questions[position], params, query_embedding=embeddings[position])
+            
+            searched = map_concurrently(search, range(len(pending_questions)), max_workers=max_workers,
+                                        rate_limiter=rate_limiter)
         
+        for position, hits, error in searched:
+            index = pending[position]
+            if error is not None:
+                # Individual search legs already retry connection errors themselves
+                logger.error(f"Error querying RAG for question {index}: {str(error)}")
+                continue
+            results[index] = self._build_result(questions[index], hits, return_full_docs)
+            if self.result_cache:
+                self.result_cache.put(cache_keys[index], results[index])
+        return results
+
+    def _build_result(self, question: str, results: List[Any], return_full_docs: bool) -> Dict[str, Any]:
+        """Build the question/answer/sources payload from search results."""
         if return_full_docs:
-            # Get unique file paths from search results
-            file_paths = set()
-            for hit in results[0]:
-                file_paths.add(hit.entity.get('file_path'))
-            
-            # Fetch all chunks for each file path
-            full_docs = {}
-            for file_path in file_paths:
-                # Query all chunks for this file
-                expr = f'file_path == "{file_path}"'
-                chunks = self.collection.query(
-                    expr=expr,
-                    output_fields=["content", "chunk_index", "metadata"],
-                    order_by="chunk_index"
-                )
-                
-                # Combine chunks in order
-                if chunks:
-                    # Sort by chunk_index to ensure correct order
-                    chunks.sort(key=lambda x: x.get('chunk_index', 0))
-                    
-                    # Extract metadata from the first chunk
-                    metadata = chunks[0].get('metadata', {})
-                    doc_type = metadata.get('type', 'unknown')
-                    
-                    # Combine all chunks
-                    full_content = ""
-                    for chunk in chunks:
-                        content = chunk.get('content', '')
-                        # Remove chunk headers if they exist
-                        if content.startswith("[Chunk "):
-                            # Find the first newline after the chunk header
-                            newline_pos = content.find('\n')
-                            if newline_pos != -1:
-                                content = content[newline_pos+1:]
-                        full_content += content
-                    
-                    # Store the complete document
-                    full_docs[file_path] = {
-                        'content': full_content,
-                        'type': doc_type
-                    }
+            # Get unique file paths from search results, in rank order
+            file_paths = list(dict.fromkeys(hit.entity.get('file_path') for hit in results[0]))
+            full_docs = self._fetch_full_documents(file_paths)
             
             # Create context from full documents
             context = "\n\n---\n\n".join([
@@ -531,10 +768,74 @@ class PersonalRAG:
         }
     
     @with_milvus_recovery(max_attempts=3)
-    def _semantic_search(self, query: str, params: Dict[str, Any]) -> List[Any]:
+    def _fetch_full_documents(self, file_paths: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Reassemble full documents from their chunks.
+        
+        Documents that are not cached are fetched with a single Milvus query,
+        grouped by file path and joined in chunk_index order.
+        
+        Args:
+            file_paths: File paths of the documents to reconstruct
+            
+        Returns:
+            Dictionary mapping file path to {'content': ..., 'type': ...}, in input order
+        """
+        full_docs = {}
+        missing = []
+        for file_path in file_paths:
+            cached = self.document_cache.get(file_path) if self.document_cache else None
+            if cached is not None:
+                full_docs[file_path] = cached
+            else:
+                missing.append(file_path)
+        
+        if missing:
+            # Query all chunks of all missing files at once
+            with self.timings.stage('fetch_documents'):
+                chunks = self.collection.query(
+                    expr=f"file_path in {json.dumps(missing)}",
+                    output_fields=["file_path", "content", "chunk_index", "metadata"]
+                )
+            
+            grouped = {}
+            for chunk in chunks:
+                grouped.setdefault(chunk.get('file_path'), []).append(chunk)
+            
+            for file_path, file_chunks in grouped.items():
+                # Sort by chunk_index to ensure correct order
+                file_chunks.sort(key=lambda x: x.get('chunk_index', 0))
+                
+                # Extract metadata from the first chunk
+                metadata = file_chunks[0].get('metadata') or {}
+                doc_type = metadata.get('type', 'unknown')
+                
+                parts = []
+                for chunk in file_chunks:
+                    content = chunk.get('content', '')
+                    # Remove chunk headers if they exist
+                    if content.startswith("[Chunk "):
+                        # Find the first newline after the chunk header
+                        newline_pos = content.find('\n')
+                        if newline_pos != -1:
+                            content = content[newline_pos+1:]
+                    parts.append(content)
+                
+                document = {'content': ''.join(parts), 'type': doc_type}
+                full_docs[file_path] = document
+                if self.document_cache:
+                    self.document_cache.put(file_path, document)
+        
+        return {path: full_docs[path] for path in file_paths if path in full_docs}
+
+    @with_milvus_recovery(max_attempts=3)
+    def _semantic_search(self, query: str, params: Dict[str, Any],
+                         query_embedding: Optional[np.ndarray] = None) -> List[Any]:
         """Perform semantic search using embeddings."""
-        # Generate query embedding
-        query_embedding = self.generate_query_embedding(query)
+        # Generate query embedding unless one was precomputed
+        if query_embedding is None:
+            with self.timings.stage('embed'):
+                query_embedding = self.generate_query_embedding(query)
         
         # Get search parameters
         metric_type = params.get("metric_type", "L2")
@@ -545,95 +846,166 @@ class PersonalRAG:
         embedding_list = query_embedding.tolist()
         
         # Search in Milvus
-        results = self.collection.search(
-            data=[embedding_list],
-            anns_field="embedding",
-            param={"metric_type": metric_type, "params": search_params},
-            limit=limit,
-            output_fields=["content", "file_path", "chunk_index", "metadata"]
-        )
+        with self.timings.stage('search'):
+            results = self.collection.search(
+                data=[embedding_list],
+                anns_field="embedding",
+                param={"metric_type": metric_type, "params": search_params},
+                limit=limit,
+                output_fields=["content", "file_path", "chunk_index", "metadata"]
+            )
         
         return results
     
     @with_milvus_recovery(max_attempts=3)
-    def _keyword_search(self, query: str, params: Dict[str, Any]) -> List[Any]:
-        """Perform keyword-based search."""
-        # Get search parameters
+    def _semantic_search_many(self, query_embeddings: np.ndarray, params: Dict[str, Any]) -> List[Any]:
+        """
+        Perform semantic search for several query embeddings in a single Milvus request.
+        
+        Args:
+            query_embeddings: Array of shape (N, embedding_dim)
+            params: Semantic search parameters
+            
+        Returns:
+            List of N hit lists, one per query embedding, in input order
+        """
+        metric_type = params.get("metric_type", "L2")
+        search_params = params.get("params", {"ef": 100})
         limit = params.get("limit", 10)
+        max_vectors = params.get("max_vectors_per_search", 1024)
         
-        # Create expression for keyword search
-        # This is a simple implementation - in a real system, you might want to use
-        # a more sophisticated approach like BM25 or TF-IDF
-        keywords = query.lower().split()
-        expr_parts = []
-        for keyword in keywords:
-            expr_parts.append(f'content like "%{keyword}%"')
+        hits_per_query = []
+        for start in range(0, len(query_embeddings), max_vectors):
+            batch = query_embeddings[start:start + max_vectors]
+            with self.timings.stage('search_many'):
+                results = self.collection.search(
+                    data=[embedding.tolist() for embedding in batch],
+                    anns_field="embedding",
+                    param={"metric_type": metric_type, "params": search_params},
+                    limit=limit,
+                    output_fields=["content", "file_path", "chunk_index", "metadata"]
+                )
+            # Milvus returns one Hits object per query vector, in request order
+            hits_per_query.extend(list(hits) for hits in results)
         
-        expr = " or ".join(expr_parts)
+        return hits_per_query
+    
+    def _get_keyword_index(self) -> BM25Index:
+        """Return the BM25 index, loading, building or refreshing it as needed."""
+        params = self.config.get("keyword_search", {})
+        index_path = params.get("index_path")
+        refresh_interval = params.get("refresh_interval", 300)
         
-        # Search in Milvus
-        results = self.collection.query(
-            expr=expr,
-            output_fields=["content", "file_path", "chunk_index", "metadata"],
-            limit=limit
-        )
+        with self.keyword_index_lock:
+            if self.keyword_index is None:
+                if index_path and os.path.exists(index_path):
+                    try:
+                        self.keyword_index = BM25Index.load(index_path)
+                        logger.info(f"Loaded BM25 index with {len(self.keyword_index)} chunks from {index_path}")
+                    except Exception as e:
+                        logger.warning(f"Could not load BM25 index from {index_path}: {str(e)}")
+                if self.keyword_index is None:
+                    self.keyword_index = BM25Index()
+                self.keyword_index_refreshed_at = 0.0
+            
+            if time.monotonic() - self.keyword_index_refreshed_at >= refresh_interval:
+                marker = self.config.get("result_cache", {}).get("version_marker", "")
+                changed = self.keyword_index.refresh_from_collection(self.collection, version_marker=marker)
+                self.keyword_index_refreshed_at = time.monotonic()
+                if changed and index_path:
+                    self.keyword_index.save(index_path)
         
-        # Convert to the same format as semantic search results
-        formatted_results = [[{"entity": result} for result in results]]
+        return self.keyword_index
+
+    @with_milvus_recovery(max_attempts=3)
+    def _keyword_search(self, query: str, params: Dict[str, Any]) -> List[Any]:
+        """Perform keyword-based search ranked by BM25."""
+        # Get search parameters
+        limit = params.get("limit", 10)
+        
+        index = self._get_keyword_index()
+        with self.timings.stage('keyword_search'):
+            ranked = index.search(query, limit=limit)
         
-        return formatted_results
+        # Convert to the same format as semantic search results
+        return [[RetrievedHit(pk, score, document) for pk, document, score in ranked]]
     
     @with_milvus_recovery(max_attempts=3)
-    def _hybrid_search(self, query: str, params: Dict[str, Any]) -> List[Any]:
-        """Perform hybrid search combining semantic and keyword approaches."""
+    def _hybrid_search(self, query: str, params: Dict[str, Any],
+                       query_embedding: Optional[np.ndarray] = None) -> List[Any]:
+        """Perform hybrid search combining semantic and keyword approaches.
+        
+        Both legs run concurrently and are fused either with weighted Reciprocal Rank
+        Fusion ("rrf", the default) or with min-max normalized scores ("weighted").
+        Hits are deduplicated by the chunk primary key.
+        """
         # Get search parameters
         semantic_weight = params.get("semantic_weight", 0.7)
         keyword_weight = params.get("keyword_weight", 0.3)
         limit = params.get("limit", 10)
+        fusion = params.get("fusion", "rrf")
+        candidate_depth = params.get("candidate_depth") or max(limit * 2, 20)
         
-        # Perform semantic search
-        semantic_results = self._semantic_search(query, {"limit": limit * 2})
-        
-        # Perform keyword search
-        keyword_results = self._keyword_search(query, {"limit": limit * 2})
-        
-        # Combine results
-        combined_results = []
-        
-        # Create a dictionary to track seen content
-        seen_content = {}
-        
-        # Process semantic results
-        for hit in semantic_results[0]:
-            content = hit.entity.get('content', '')
-            if content not in seen_content:
-                seen_content[content] = {
-                    "entity": hit.entity,
-                    "score": hit.score * semantic_weight
-                }
-                combined_results.append(hit)
-        
-        # Process keyword results
-        for hit in keyword_results[0]:
-            content = hit.entity.get('content', '')
-            if content in seen_content:
-                # Update score for existing content
-                seen_content[content]["score"] += keyword_weight
-            else:
-                # Add new content
-                seen_content[content] = {
-                    "entity": hit.entity,
-                    "score": keyword_weight
-                }
-                combined_results.append(hit)
+        semantic_params = dict(self.config.get("semantic_search", {}), limit=candidate_depth)
+        keyword_params = dict(self.config.get("keyword_search", {}), limit=candidate_depth)
         
-        # Sort by combined score
-        combined_results.sort(key=lambda x: seen_content[x.entity.get('content', '')]["score"], reverse=True)
+        # Run the keyword leg in the background while the semantic leg runs here
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            keyword_future = executor.submit(self._keyword_search, query, keyword_params)
+            semantic_hits = list(self._semantic_search(query, semantic_params, query_embedding=query_embedding)[0])
+            keyword_hits = list(keyword_future.result()[0])
+        
+        if fusion == "rrf":
+            rrf_k = params.get("rrf_k", 60)
+            semantic_scores = [1.0 / (rrf_k + rank) for rank in range(1, len(semantic_hits) + 1)]
+            keyword_scores = [1.0 / (rrf_k + rank) for rank in range(1, len(keyword_hits) + 1)]
+        else:
+            higher_is_better = semantic_params.get("metric_type", "L2").upper() != "L2"
+            semantic_scores = self._normalize_scores([hit.score for hit in semantic_hits], higher_is_better)
+            keyword_scores = self._normalize_scores([hit.score for hit in keyword_hits], True)
         
-        # Limit to requested number of results
-        combined_results = combined_results[:limit]
+        # Fuse by chunk primary key
+        fused = {}
+        for hits, scores, weight in ((semantic_hits, semantic_scores, semantic_weight),
+                                     (keyword_hits, keyword_scores, keyword_weight)):
+            for hit, score in zip(hits, scores):
+                if hit.id in fused:
+                    fused[hit.id][1] += weight * score
+                else:
+                    fused[hit.id] = [hit.entity, weight * score]
         
-        return [combined_results]
+        ranked = sorted(fused.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [[RetrievedHit(pk, score, entity) for pk, (entity, score) in ranked]]
+
+    @staticmethod
+    def _normalize_scores(scores: List[float], higher_is_better: bool) -> List[float]:
+        """Min-max normalize scores to [0, 1] where 1 is the best match."""
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        if higher_is_better:
+            return [(score - low) / (high - low) for score in scores]
+        return [(high - score) / (high - low) for score in scores]
+
+_shared_instances = {}
+_shared_lock = threading.Lock()
+
+
+def get_personal_rag(**kwargs) -> PersonalRAG:
+    """
+    Return a process-wide PersonalRAG instance for the given constructor arguments.
+    
+    The first call creates the instance; later calls with the same arguments reuse it,
+    so models, the Milvus connection and caches survive between scheduled runs.
+    """
+    key = tuple(sorted((name, str(value)) for name, value in kwargs.items()))
+    with _shared_lock:
+        if key not in _shared_instances:
+            _shared_instances[key] = PersonalRAG(**kwargs)
+        return _shared_instances[key]
+
 
 def main():
     # Parse command line arguments
@@ -1,17 +1,27 @@
 import os
 import sys
 import json
-import time
 import logging
 import functools
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
-from database import Database
+from db_pool import get_pool
 from apify_wrapper import ApifyWrapper
-import importlib.util
-import PIL
+from scheduling import call_with_backoff, TokenBucket, StageTimer
+from batch_analysis import BatchAnalysisRunner, OpenAIBatchClient, FINAL_STATUSES
+from analysis_parsing import parse_analysis_response, SCORE_PATTERN, BEST_FIT_THRESHOLD
+from prompt_builder import FitnessPromptBuilder
+from job_dedup import JobDeduplicator
+from skill_extractor import SkillExtractor
+from migrate import apply_migrations
+from jobs_table import ingest_pages, bulk_update
+from scrape_watermark import ScrapeWatermark
+from multi_task_scraper import MultiTaskScraper
+from staged_pipeline import Stage, StagedPipeline
+from work_queue import JobWorkQueue, default_worker_id
 
 # Load environment variables
 load_dotenv()
@@ -63,70 +73,162 @@ def with_milvus_recovery(max_attempts=3):
         return wrapper
     return decorator
 
+def milvus_reachable():
+    """Check with a plain socket connection whether the Milvus server at MILVUS_HOST:MILVUS_PORT is accessible."""
+    try:
+        # Try to connect to Milvus server using socket
+        host = os.getenv('MILVUS_HOST', 'localhost')
+        port = int(os.getenv('MILVUS_PORT', 19530))
+        
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(2)  # 2 second timeout
+        result = sock.connect_ex((host, port))
+        sock.close()
+        
+        if result == 0:
+            logger.info(f"Milvus server is accessible at {host}:{port}")
+            return True
+        else:
+            logger.warning(f"Cannot connect to Milvus server at {host}:{port}")
+            return False
+    except Exception as e:
+        logger.error(f"Error checking Milvus connection: {str(e)}")
+        return False
+
+def get_shared_rag():
+    """Return the process-wide PersonalRAG instance used for job processing.
+    
+    Models and the Milvus collection are loaded lazily on the first query, and the
+    same instance is reused by every JobProcessor in this process.
+    """
+    from personal_rag import get_personal_rag, QueryMethod
+    
+    return get_personal_rag(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
+        llm_type="gpt",  # Use GPT for RAG queries
+        query_method=QueryMethod.SEMANTIC
+    )
+
 class JobProcessor:
-    def __init__(self, test_mode=False):
+    def __init__(self, test_mode=False, rag=None, use_rag=True):
         """Initialize the job processor with required components.
         
         Args:
             test_mode (bool): Whether to run in test mode (skip job retrieval and insertion)
+            rag (PersonalRAG, optional): Shared RAG instance to reuse instead of the process-wide default
+            use_rag (bool): Whether to set up the RAG system at all
         """
-        self.db = Database()
+        # Connection held from the shared pool for this run; close() returns it
+        self.db = get_pool().lease()
         self.apify = ApifyWrapper()
-        self.openai_client = OpenAI()
+        self._openai_client = None
         self.test_mode = test_mode
         
+        # Concurrency and retry settings for OpenAI calls
+        self.keyword_concurrency = int(os.getenv('KEYWORD_CONCURRENCY', 8))
+        
+        # Keyword backend: 'llm' (default) or the opt-in 'local' skill taxonomy matcher (LLM only for low-coverage jobs)
+        self.keyword_backend = os.getenv('KEYWORD_BACKEND', 'llm').lower()
+        self.keyword_llm_fallback = os.getenv('KEYWORD_LLM_FALLBACK', 'true').lower() == 'true'
+        self._skill_extractor = None
+        self._skill_extractor_lock = threading.Lock()
+        self.openai_timeout = float(os.getenv('OPENAI_REQUEST_TIMEOUT', 60))
+        self.openai_max_retries = int(os.getenv('OPENAI_MAX_RETRIES', 5))
+        
+        # RAG retrieval scheduling: retrievals are local, so no rate limit unless configured
+        self.rag_concurrency = int(os.getenv('RAG_CONCURRENCY', 4))
+        self.rag_rate_limiter = TokenBucket(float(os.getenv('RAG_QUERIES_PER_SECOND', 0)))
+        self.timer = StageTimer()
+        
+        # Near-duplicate detection so reposted jobs reuse earlier enrichment instead of new LLM calls
+        self.deduplicator = JobDeduplicator(self.db.conn, threshold=float(os.getenv('DEDUP_THRESHOLD', 0.85)),
+                                            log=self.log,
+                                            canonical_timeout_hours=float(os.getenv('DEDUP_CANONICAL_TIMEOUT_HOURS', 24)))
+        
+        # Token-budgeted fitness prompts with a static, cacheable prefix
+        self.prompt_builder = FitnessPromptBuilder.from_env(model="gpt-4o")
+        
+        # Identifies this process in work queue claims
+        self.worker_id = default_worker_id()
+        
+        # Enrichment mode: 'staged' (overlapping stages with bounded queues) or 'sequential' (one stage after another)
+        self.pipeline_mode = os.getenv('PIPELINE_MODE', 'staged').lower()
+        
+        # Fitness analysis mode: 'sync' (one request per job) or 'batch' (OpenAI Batch API)
+        self.analysis_mode = os.getenv('ANALYSIS_MODE', 'sync').lower()
+        self._batch_client = None
+        
         # Create log directories
         os.makedirs('logs', exist_ok=True)
         os.makedirs('debug_logs', exist_ok=True)
         
-        # Import the PersonalRAG class from personal_rag.py
-        try:
-            logger.info("Loading PersonalRAG module...")
-            
-            # Use the local personal_rag.py file
-            module_path = os.path.join(os.path.dirname(__file__), "personal_rag.py")
-            logger.info(f"Loading PersonalRAG from: {module_path}")
-            
-            if os.path.exists(module_path):
-                spec = importlib.util.spec_from_file_location("personal_rag", module_path)
-                rag_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(rag_module)
-                self.PersonalRAG = rag_module.PersonalRAG
-                self.QueryMethod = rag_module.QueryMethod  # Also import the QueryMethod enum
-                logger.info("PersonalRAG module loaded successfully")
-            else:
-                raise ImportError(f"personal_rag.py not found at {module_path}")
-                
-        except Exception as e:
-            logger.error(f"Error loading Personal RAG module: {str(e)}")
-            logger.error("Make sure personal_rag.py exists in the current directory")
-            logger.error("Try installing the required dependencies: pip install -r requirements.txt")
-            sys.exit(1)
-        
-        # Initialize RAG system
-        try:
-            logger.info("Initializing PersonalRAG system...")
-            
-            # Check Milvus connection first (unless skipped)
-            if os.getenv('SKIP_MILVUS_CHECK', '').lower() != 'true':
-                self._ensure_milvus_connection()
-            else:
-                logger.info("Skipping Milvus connection check as per environment variable")
-            
-            # Use the enum value instead of string
-            query_method_enum = self.QueryMethod.SEMANTIC
-            self.rag = self.PersonalRAG(
-                openai_api_key=os.getenv("OPENAI_API_KEY"),
-                anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
-                llm_type="gpt",  # Use GPT for RAG queries
-                query_method=query_method_enum  # Use the enum value instead of a string
-            )
-            logger.info("PersonalRAG initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing PersonalRAG: {str(e)}")
-            # Continue without RAG if initialization fails
+        # Initialize RAG system (reuse a shared instance when one is passed in)
+        if rag is not None:
+            self.rag = rag
+        elif not use_rag:
+            logger.info("RAG disabled, skipping PersonalRAG initialization")
             self.rag = None
+        else:
+            try:
+                logger.info("Initializing PersonalRAG system...")
+                
+                # Check Milvus connection first (unless skipped)
+                if os.getenv('SKIP_MILVUS_CHECK', '').lower() != 'true':
+                    self._ensure_milvus_connection()
+                else:
+                    logger.info("Skipping Milvus connection check as per environment variable")
+                
+                self.rag = get_shared_rag()
+                logger.info("PersonalRAG initialized successfully")
+            except Exception as e:
+                logger.error(f"Error initializing PersonalRAG: {str(e)}")
+                # Continue without RAG if initialization fails
+                self.rag = None
 
+    @property
+    def openai_client(self):
+        """OpenAI client, created (and the openai package imported) on first use."""
+        if self._openai_client is None:
+            from openai import OpenAI
+            # Retries are handled by _chat_completion so they can back off on 429s
+            self._openai_client = OpenAI(max_retries=0)
+        return self._openai_client
+    
+    @property
+    def skill_extractor(self):
+        """Local skill extractor, built on first use and fit on recent postings for TF-IDF ranking."""
+        with self._skill_extractor_lock:
+            if self._skill_extractor is None:
+                extractor = SkillExtractor.from_env()
+                corpus_size = int(os.getenv('KEYWORD_TFIDF_CORPUS', 2000))
+                if corpus_size > 0:
+                    try:
+                        with get_pool().connection() as conn, conn.cursor() as cur:
+                            cur.execute("""
+                                SELECT title, description
+                                FROM jobs
+                                ORDER BY id DESC
+                                LIMIT %s
+                            """, (corpus_size,))
+                            extractor.fit(f"{title or ''} {description or ''}" for title, description in cur.fetchall())
+                        self.log(f"Fit skill extractor on {extractor.corpus_size} job postings")
+                    except Exception as e:
+                        self.log(f"Error loading TF-IDF corpus, ranking skills by frequency only: {str(e)}")
+                self._skill_extractor = extractor
+            return self._skill_extractor
+    
+    @property
+    def batch_client(self):
+        """Batch API client used in batch analysis mode (replaceable, e.g. with a FakeBatchClient)."""
+        if self._batch_client is None:
+            self._batch_client = OpenAIBatchClient(self.openai_client)
+        return self._batch_client
+    
+    @batch_client.setter
+    def batch_client(self, client):
+        self._batch_client = client
+    
     def _check_milvus_connection(self):
         """Check if Milvus server is accessible."""
         # Skip check if SKIP_MILVUS_CHECK is set
@@ -134,25 +236,7 @@ class JobProcessor:
             logger.info("Skipping Milvus connection check as per environment variable")
             return True
             
-        try:
-            # Try to connect to Milvus server using socket
-            host = os.getenv('MILVUS_HOST', 'localhost')
-            port = int(os.getenv('MILVUS_PORT', 19530))
-            
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)  # 2 second timeout
-            result = sock.connect_ex((host, port))
-            sock.close()
-            
-            if result == 0:
-                logger.info(f"Milvus server is accessible at {host}:{port}")
-                return True
-            else:
-                logger.warning(f"Cannot connect to Milvus server at {host}:{port}")
-                return False
-        except Exception as e:
-            logger.error(f"Error checking Milvus connection: {str(e)}")
-            return False
+        return milvus_reachable()
     
     def _ensure_milvus_connection(self):
         """Ensure connection to Milvus is possible."""
@@ -191,41 +275,59 @@ class JobProcessor:
         self.log("Starting job processing workflow")
         
         try:
+            # Bring the jobs table up to the latest schema version before any stage queries it
+            self.migrate_schema()
+            
             if not self.test_mode:
-                # Step 1: Retrieve new jobs from Apify
-                self.log("Step 1: Retrieving jobs from Apify")
-                jobs = self.retrieve_jobs()
-                
-                if not jobs or len(jobs) == 0:
-                    self.log("No jobs found to process. Exiting.")
-                    return
+                # Steps 1 and 2: Stream jobs from the Apify dataset into the database page by page
+                self.log("Steps 1-2: Streaming jobs from Apify into the database")
+                job_count = self.ingest_jobs()
                 
-                self.log(f"Retrieved {len(jobs)} jobs")
-                
-                # Step 2: Insert jobs into database
-                self.log("Step 2: Inserting jobs into database")
-                self.db.insert_jobs(jobs)
+                # With incremental scraping a run may bring no new jobs; earlier jobs may still need processing
+                if not job_count:
+                    self.log("No new jobs found, continuing with jobs already in the database")
+                else:
+                    self.log(f"Stored {job_count} jobs")
             else:
                 # Skip steps 1 and 2 in test mode
                 self.log("TEST MODE: Skipping job retrieval and insertion (steps 1 and 2)")
             
-            # Step 3: Process jobs without keywords
-            self.log("Step 3: Processing jobs without keywords")
-            processed_count = self.process_job_keywords()
-            self.log(f"Processed keywords for {processed_count} jobs")
+            # Flag reposts of known jobs and reuse their enrichment before any LLM call
+            self.log("Deduplicating new jobs")
+            duplicate_count = self.deduplicate_jobs()
+            self.log(f"Flagged {duplicate_count} jobs as duplicates")
             
-            # Step 4: Query RAG for jobs with keywords but no RAG info
-            self.log("Step 4: Querying RAG for jobs with keywords")
-            rag_processed = self.process_job_rag_info()
-            self.log(f"Retrieved RAG info for {rag_processed} jobs")
+            if self.pipeline_mode == 'staged':
+                # Steps 3-5: Keywords, RAG and fitness analysis as overlapping stages
+                self.log("Steps 3-5: Running keyword, RAG and analysis stages concurrently")
+                analyzed_count = self.process_jobs_staged()
+                self.log(f"Analyzed fitness for {analyzed_count} jobs")
+                
+                # Batch API analyses are submitted as a whole after the staged enrichment
+                if self.analysis_mode == 'batch':
+                    analyzed_count = self.analyze_job_fitness_batch()
+                    self.log(f"Analyzed fitness for {analyzed_count} jobs in batch mode")
+            else:
+                # Step 3: Process jobs without keywords
+                self.log("Step 3: Processing jobs without keywords")
+                processed_count = self.process_job_keywords()
+                self.log(f"Processed keywords for {processed_count} jobs")
+                
+                # Step 4: Query RAG for jobs with keywords but no RAG info
+                self.log("Step 4: Querying RAG for jobs with keywords")
+                rag_processed = self.process_job_rag_info()
+                self.log(f"Retrieved RAG info for {rag_processed} jobs")
+                
+                # Step 5: Analyze fitness of jobs against RAG info
+                self.log("Step 5: Analyzing job fitness against RAG info")
+                analyzed_count = self.analyze_job_fitness()
+                self.log(f"Analyzed fitness for {analyzed_count} jobs")
             
-            # Step 5: Analyze fitness of jobs against RAG info
-            self.log("Step 5: Analyzing job fitness against RAG info")
-            analyzed_count = self.analyze_job_fitness()
-            self.log(f"Analyzed fitness for {analyzed_count} jobs")
+            # Copy the new enrichment over to duplicates of the jobs just processed
+            self.copy_to_duplicates()
             
-            # Step 6: Extract scores from existing analyses
-            self.log("Step 6: Extracting scores from existing job analyses")
+            # Step 6: Backfill scores for older analyses stored without one
+            self.log("Step 6: Backfilling scores for existing job analyses")
             score_count = self.process_job_scores()
             self.log(f"Extracted scores for {score_count} jobs")
             
@@ -237,6 +339,106 @@ class JobProcessor:
             self.log(f"Traceback: {traceback.format_exc()}")
         finally:
             self.db.close()
+            self.log(f"Database pool: {get_pool().stats()}")
+    
+    def drain_backlog(self):
+        """Process pending jobs until the backlog is empty (no scraping); safe to run in several processes."""
+        self.log(f"Worker {self.worker_id} draining the job backlog")
+        try:
+            self.migrate_schema()
+            
+            # Flag reposts before enrichment so they don't get their own LLM calls
+            duplicate_count = self.deduplicate_jobs()
+            self.log(f"Flagged {duplicate_count} jobs as duplicates")
+            
+            analyzed_count = self.process_jobs_staged()
+            self.log(f"Worker {self.worker_id} analyzed fitness for {analyzed_count} jobs")
+            if self.analysis_mode == 'batch':
+                analyzed_count = self.analyze_job_fitness_batch()
+                self.log(f"Worker {self.worker_id} analyzed fitness for {analyzed_count} jobs in batch mode")
+            
+            self.copy_to_duplicates()
+            self.process_job_scores()
+            return analyzed_count
+        except Exception as e:
+            self.log(f"Error draining job backlog: {str(e)}")
+            return 0
+        finally:
+            self.db.close()
+            self.log(f"Database pool: {get_pool().stats()}")
+    
+    def migrate_schema(self):
+        """Apply pending schema migrations (see migrate.py); a no-op when the schema is current."""
+        try:
+            applied = apply_migrations(self.db.conn, log=self.log)
+            if applied:
+                self.log(f"Applied {len(applied)} schema migrations")
+            return len(applied)
+        except Exception as e:
+            self.db.conn.rollback()
+            self.log(f"Error applying schema migrations: {str(e)}")
+            return 0
+    
+    def deduplicate_jobs(self):
+        """Fingerprint newly inserted jobs and link near-duplicates to their canonical posting."""
+        try:
+            duplicate_count = self.deduplicator.deduplicate_new_jobs()
+            self.copy_to_duplicates()
+            # Duplicates whose canonical job will never be analyzed are processed on their own
+            released = self.deduplicator.release_orphaned_duplicates()
+            if released:
+                self.log(f"Released {released} duplicates without an analyzed canonical job")
+            return duplicate_count
+        except Exception as e:
+            self.db.conn.rollback()
+            self.log(f"Error deduplicating jobs: {str(e)}")
+            return 0
+    
+    def copy_to_duplicates(self):
+        """Copy keywords, RAG info and analyses from canonical jobs to their duplicates."""
+        try:
+            copied = self.deduplicator.copy_from_canonical()
+            if copied:
+                self.log(f"Copied enrichment to {copied} duplicate jobs")
+            return copied
+        except Exception as e:
+            self.db.conn.rollback()
+            self.log(f"Error copying enrichment to duplicate jobs: {str(e)}")
+            return 0
+    
+    def ingest_jobs(self):
+        """Scrape all configured Apify tasks concurrently and upsert their merged jobs page by page."""
+        scraper = None
+        try:
+            # Incremental mode skips items already ingested for each task before any mapping or writes
+            watermarks = {}
+            if os.getenv('APIFY_INCREMENTAL', 'true').lower() == 'true':
+                for task in self.apify.tasks:
+                    watermarks[task['task_id']] = ScrapeWatermark(
+                        task['task_id'],
+                        path=os.getenv('WATERMARK_PATH', 'cache/scrape_watermarks.json'),
+                        lookback_days=int(os.getenv('WATERMARK_LOOKBACK_DAYS', 2)),
+                        date_filter_field=os.getenv('APIFY_DATE_FILTER_FIELD') or None
+                    )
+            
+            scraper = MultiTaskScraper(
+                self.apify,
+                self.apify.tasks,
+                page_size=int(os.getenv('APIFY_PAGE_SIZE', 500)),
+                max_concurrency=int(os.getenv('APIFY_TASK_CONCURRENCY', 3)),
+                watermarks=watermarks
+            )
+            self.log(f"Scraping {len(self.apify.tasks)} Apify tasks")
+            return ingest_pages(self.db.conn, scraper.iter_pages(), log=self.log,
+                                method=os.getenv('JOBS_UPSERT_METHOD', 'values'),
+                                watermark=scraper if watermarks else None)
+        except Exception as e:
+            self.log(f"Error ingesting jobs: {str(e)}")
+            return 0
+        finally:
+            if scraper:
+                for line in scraper.report_lines():
+                    self.log(line)
     
     def retrieve_jobs(self):
         """Retrieve jobs from Apify."""
@@ -248,57 +450,262 @@ class JobProcessor:
             self.log(f"Error retrieving jobs: {str(e)}")
             return None
     
-    def process_job_keywords(self):
-        """Process jobs that don't have keywords yet."""
+    def process_jobs_staged(self):
+        """Drain the backlog through keyword extraction, RAG lookup and fitness analysis as a staged pipeline.
+        
+        Jobs are claimed from the database work queue page by page as the pipeline has
+        room, so several workers (threads of other runs, processes or hosts) can drain the
+        same backlog without duplicating work. Each job moves to the next stage as soon as
+        the previous one is done with it; a single store stage writes results back in small
+        batches and releases the claims.
+        
+        Returns:
+            int: Number of jobs analyzed
+        """
+        queue_db = None
         try:
-            # Get jobs without keywords
-            with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, job_id, title, description
-                    FROM jobs 
-                    WHERE keyword IS NULL
-                    LIMIT 50
-                """)
-                jobs = cur.fetchall()
-            
-            if not jobs:
-                self.log("No jobs found without keywords")
-                return 0
+            # Claims use their own connection so they never share a transaction with the store stage
+            queue_db = get_pool().lease()
+            work_queue = JobWorkQueue(
+                queue_db.conn,
+                self._pending_condition(),
+                worker_id=self.worker_id,
+                lease_seconds=int(os.getenv('WORK_LEASE_SECONDS', 900))
+            )
+            jobs = (self._pipeline_job(row) for row in
+                    work_queue.iter_claims(batch_size=int(os.getenv('PIPELINE_BATCH_SIZE', 25))))
             
-            processed_count = 0
+            if self.rag:
+                self.rag.timings.reset()
+            pipeline = StagedPipeline([
+                Stage('keywords', self._keyword_stage, workers=self.keyword_concurrency),
+                Stage('rag', self._rag_stage, workers=int(os.getenv('RAG_STAGE_WORKERS', 2)),
+                      batch_size=int(os.getenv('RAG_STAGE_BATCH_SIZE', 8))),
+                Stage('analysis', self._analysis_stage, workers=int(os.getenv('ANALYSIS_CONCURRENCY', 4))),
+                Stage('store', self._store_stage, workers=1, batch_size=int(os.getenv('STORE_BATCH_SIZE', 20)),
+                      max_batch_wait=1.0)
+            ], queue_size=int(os.getenv('PIPELINE_QUEUE_SIZE', 16)), log=self.log)
+            results = pipeline.run(jobs)
             
-            for job in jobs:
-                job_id = job[1]  # job_id is the second column
-                title = job[2]
-                description = job[3]
-                
-                self.log(f"Extracting keywords for job: {title} (ID: {job_id})")
-                
-                # Extract keywords using OpenAI
-                keywords = self.extract_keywords(title, description)
+            if not work_queue.claimed:
+                self.log("No jobs found that need processing")
+                return 0
+            
+            self.log(f"Worker {self.worker_id} processed {work_queue.claimed} claimed jobs")
+            self.log(f"Pipeline stages: {pipeline.summary()}")
+            if self.rag:
+                self.log(f"RAG retrieval timings: {self.rag.timings.summary()}")
+            failed = sum(1 for job in results if not job['stored'])
+            if failed:
+                self.log(f"Failed to store results for {failed} jobs")
+            return sum(1 for job in results if job['stored'] and job['analysis'])
+        
+        except Exception as e:
+            self.log(f"Error in staged job processing: {str(e)}")
+            return 0
+        finally:
+            if queue_db:
+                queue_db.close()
+    
+    def _pending_condition(self):
+        """SQL condition for jobs that still need work from this processor."""
+        states = ['needs_keywords']
+        # Only the RAG stage needs the RAG instance; jobs that already have RAG info can still be analyzed
+        if self.rag:
+            states.append('needs_rag')
+        # In batch mode analyses are submitted through the Batch API afterwards
+        if self.analysis_mode != 'batch':
+            states.append('needs_analysis')
+        # A subset of the states in idx_pipeline_work_queue, so claims use that partial index
+        return "pipeline_state IN (" + ", ".join(f"'{state}'" for state in states) + ")"
+    
+    def _claim_pages(self, state, page_size, lease_seconds=None):
+        """Claim jobs in one pipeline state page by page until none are left.
+        
+        Used by the sequential stages so overlapping runs never process the same jobs.
+        The caller writes each page's results and releases its claims with _release_claimed().
+        
+        Args:
+            state: Pipeline state of the jobs to claim
+            page_size: Jobs claimed at a time
+            lease_seconds: Claim lease (defaults to WORK_LEASE_SECONDS)
+        
+        Yields:
+            list: Claimed jobs as dictionaries (see work_queue.JOB_QUEUE_COLUMNS), ordered by id
+        """
+        queue_db = get_pool().lease()
+        try:
+            work_queue = JobWorkQueue(
+                queue_db.conn,
+                f"pipeline_state = '{state}'",
+                worker_id=self.worker_id,
+                lease_seconds=lease_seconds or int(os.getenv('WORK_LEASE_SECONDS', 900))
+            )
+            after_id = 0
+            while True:
+                jobs = work_queue.claim(page_size, after_id)
+                if not jobs:
+                    return
+                yield jobs
+                after_id = jobs[-1]['id']
+        finally:
+            queue_db.close()
+    
+    def _release_claimed(self, jobs, write=None, key='job_id', worker_id=None):
+        """Run write() (if given) and release the claims on jobs in one transaction.
+        
+        Args:
+            jobs: Claimed jobs as dictionaries
+            write: Optional function writing their results (without committing)
+            key: Dictionary key holding the job ID
+            worker_id: Worker holding the claims (defaults to this processor)
+        """
+        try:
+            if write:
+                write()
+            with self.db.conn.cursor() as cur:
+                JobWorkQueue.release(cur, [job[key] for job in jobs], worker_id or self.worker_id)
+            self.db.conn.commit()
+        except Exception:
+            self.db.conn.rollback()
+            raise
+    
+    @staticmethod
+    def _pipeline_job(row):
+        """Turn a claimed row into the job dictionary passed between pipeline stages."""
+        return {'id': row['job_id'], 'row_id': row['id'], 'title': row['title'], 'description': row['description'],
+                'keyword': row['keyword'], 'rag_info': row['rag_info'], 'analysis': None, 'stored': False}
+    
+    def _keyword_stage(self, job):
+        """Pipeline stage: extract keywords for a job that has none."""
+        if not job['keyword']:
+            self.log(f"Extracting keywords for job: {job['title']} (ID: {job['id']})")
+            job['keyword'] = self.extract_keywords(job['title'], job['description'])
+        return job
+    
+    def _rag_stage(self, jobs):
+        """Pipeline stage: query RAG for a micro-batch of jobs with keywords but no RAG info."""
+        pending = [job for job in jobs if job['keyword'] and not job['rag_info']]
+        if not pending or not self.rag:
+            return jobs
+        
+        queries = [f"My experience and skills related to these technologies and skills: {job['keyword']}"
+                   for job in pending]
+        rag_results = self.rag.query_many(queries, rate_limiter=self.rag_rate_limiter)
+        for job, rag_result in zip(pending, rag_results):
+            if rag_result and "answer" in rag_result:
+                with open(f"debug_logs/rag_result_{job['id']}.json", "w") as f:
+                    json.dump(rag_result, f, indent=2)
+                job['rag_info'] = rag_result["answer"]
+            else:
+                self.log(f"Failed to get RAG info for job {job['id']}")
+        return jobs
+    
+    def _analysis_stage(self, job):
+        """Pipeline stage: analyze the fitness of a job with RAG info (sync analysis mode only)."""
+        if self.analysis_mode != 'batch' and job['rag_info'] and not job['analysis']:
+            self.log(f"Analyzing fitness for job: {job['title']} (ID: {job['id']})")
+            job['analysis'] = self.analyze_with_gpt(job)
+        return job
+    
+    def _store_stage(self, jobs):
+        """Pipeline stage: write the results of a batch of jobs in batched UPDATEs.
+        
+        Jobs whose results were committed are marked as stored. If the write fails, the
+        claims are still released so the jobs can be picked up again, and the error is
+        passed on to the pipeline.
+        """
+        enrichment = [(job['id'], job['keyword'], job['rag_info']) for job in jobs if job['keyword']]
+        analyses = [(job['id'], job['analysis']['analysis'], job['analysis']['is_best_fit'], job['analysis']['score'])
+                    for job in jobs if job['analysis']]
+        try:
+            # Results and claim release are committed together
+            bulk_update(self.db.conn, ['keyword', 'rag_info'], enrichment)
+            if analyses:
+                self._write_analyses(analyses, commit=False)
+            with self.db.conn.cursor() as cur:
+                JobWorkQueue.release(cur, [job['id'] for job in jobs], self.worker_id)
+            self.db.conn.commit()
+        except Exception:
+            self.db.conn.rollback()
+            self._release_claimed(jobs, key='id')
+            raise
+        for job in jobs:
+            job['stored'] = True
+        return jobs
+    
+    def process_job_keywords(self):
+        """Process jobs that don't have keywords yet."""
+        processed = 0
+        claimed = 0
+        try:
+            # Claim jobs without keywords page by page
+            for jobs in self._claim_pages('needs_keywords', page_size=50):
+                claimed += len(jobs)
                 
-                if keywords:
-                    # Update the database with the keywords
-                    with self.db.conn.cursor() as cur:
-                        cur.execute("""
-                            UPDATE jobs
-                            SET keyword = %s
-                            WHERE job_id = %s
-                        """, (keywords, job_id))
-                        self.db.conn.commit()
+                # Extract keywords concurrently, bounded by the concurrency limit
+                results = []
+                max_workers = max(1, min(self.keyword_concurrency, len(jobs)))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {}
+                    for job in jobs:
+                        self.log(f"Extracting keywords for job: {job['title']} (ID: {job['job_id']})")
+                        futures[executor.submit(self.extract_keywords, job['title'], job['description'])] = job['job_id']
                     
-                    processed_count += 1
-                    self.log(f"Updated keywords for job {job_id}: {keywords}")
-                else:
-                    self.log(f"Failed to extract keywords for job {job_id}")
+                    for future in as_completed(futures):
+                        job_id = futures[future]
+                        keywords = future.result()
+                        if keywords:
+                            results.append((job_id, keywords))
+                            self.log(f"Extracted keywords for job {job_id}: {keywords}")
+                        else:
+                            self.log(f"Failed to extract keywords for job {job_id}")
+                
+                # Write the page's keywords in a single batched UPDATE and release its claims
+                self._release_claimed(jobs, lambda: bulk_update(self.db.conn, ['keyword'], results))
+                if results:
+                    self.log(f"Updated keywords for {len(results)} jobs")
+                processed += len(results)
             
-            return processed_count
+            if not claimed:
+                self.log("No jobs found without keywords")
+            return processed
         
         except Exception as e:
             self.log(f"Error processing job keywords: {str(e)}")
-            return 0
+            return processed
+    
+    def _chat_completion(self, **kwargs):
+        """Create a chat completion with a per-request timeout and backoff on rate limits."""
+        from openai import RateLimitError, APITimeoutError, APIConnectionError
+        
+        return call_with_backoff(
+            self.openai_client.chat.completions.create,
+            retry_on=(RateLimitError, APITimeoutError, APIConnectionError),
+            max_retries=self.openai_max_retries,
+            timeout=self.openai_timeout,
+            **kwargs
+        )
     
     def extract_keywords(self, title, description):
+        """Extract keywords from job title and description with the configured backend."""
+        if self.keyword_backend != 'local':
+            return self._extract_keywords_llm(title, description)
+        
+        try:
+            # Without the LLM fallback, any skill found is better than none
+            keywords = self.skill_extractor.keywords(title, description,
+                                                     min_skills=None if self.keyword_llm_fallback else 1)
+        except Exception as e:
+            self.log(f"Error extracting keywords locally: {str(e)}")
+            keywords = None
+        
+        if keywords or not self.keyword_llm_fallback:
+            return keywords
+        self.log(f"Low skill coverage for job '{title}', falling back to the LLM")
+        return self._extract_keywords_llm(title, description)
+    
+    def _extract_keywords_llm(self, title, description):
         """Extract keywords from job title and description using GPT."""
         try:
             prompt = f"""
@@ -312,7 +719,7 @@ class JobProcessor:
             {description[:4000]}  # Limit description length
             """
             
-            response = self.openai_client.chat.completions.create(
+            response = self._chat_completion(
                 model="gpt-3.5-turbo",  # Using the smaller model for keyword extraction
                 messages=[
                     {"role": "system", "content": "You are a job keyword extraction assistant. Extract only the most relevant technical skills and software tools from job descriptions."},
@@ -339,259 +746,269 @@ class JobProcessor:
             self.log("RAG system not initialized. Skipping RAG processing.")
             return 0
         
+        processed = 0
+        claimed = 0
         try:
-            # Get jobs with keywords but no RAG info
-            with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, job_id, title, keyword
-                    FROM jobs 
-                    WHERE keyword IS NOT NULL AND rag_info IS NULL
-                    LIMIT 25
-                """)
-                jobs = cur.fetchall()
-            
-            if not jobs:
-                self.log("No jobs found with keywords but without RAG info")
-                return 0
-            
-            processed_count = 0
+            self.timer.reset()
+            self.rag.timings.reset()
             
-            for job in jobs:
-                job_id = job[1]
-                title = job[2]
-                keywords = job[3]
+            # Claim jobs with keywords but no RAG info page by page
+            for jobs in self._claim_pages('needs_rag', page_size=25):
+                claimed += len(jobs)
                 
-                self.log(f"Querying RAG for job: {title} (ID: {job_id})")
+                # Build RAG queries for the whole page
+                queries = []
+                for job in jobs:
+                    self.log(f"Querying RAG for job: {job['title']} (ID: {job['job_id']})")
+                    queries.append(f"My experience and skills related to these technologies and skills: {job['keyword']}")
                 
-                # Build RAG query
-                query = f"My experience and skills related to these technologies and skills: {keywords}"
+                # Encode all queries in batches and retrieve them in as few Milvus requests as possible
+                with self.timer.stage('retrieval_batch'):
+                    rag_results = self.rag.query_many(queries, max_workers=self.rag_concurrency,
+                                                      rate_limiter=self.rag_rate_limiter)
                 
-                # Query the RAG system
-                rag_result = self.rag.query(query)
-                time.sleep(15)
+                # Results come back in query order; map them back to their job IDs
+                updates = []
+                for job, rag_result in zip(jobs, rag_results):
+                    job_id = job['job_id']
+                    if rag_result and "answer" in rag_result:
+                        # Save the full RAG result for debugging
+                        with self.timer.stage('debug_dump'):
+                            with open(f"debug_logs/rag_result_{job_id}.json", "w") as f:
+                                json.dump(rag_result, f, indent=2)
+                        updates.append((job_id, rag_result["answer"]))
+                    else:
+                        self.log(f"Failed to get RAG info for job {job_id}")
                 
-                if rag_result and "answer" in rag_result:
-                    rag_info = rag_result["answer"]
-                    
-                    # Save sources as a JSON string
-                    sources = json.dumps(rag_result.get("sources", []))
-                    
-                    # Save the full RAG result for debugging
-                    with open(f"debug_logs/rag_result_{job_id}.json", "w") as f:
-                        json.dump(rag_result, f, indent=2)
-                    
-                    # Update the database with the RAG info
-                    with self.db.conn.cursor() as cur:
-                        cur.execute("""
-                            UPDATE jobs
-                            SET rag_info = %s
-                            WHERE job_id = %s
-                        """, (rag_info, job_id))
-                        self.db.conn.commit()
-                    
-                    processed_count += 1
-                    self.log(f"Updated RAG info for job {job_id}")
-                    
-                    # Don't overload the system
-                    time.sleep(1)
-                else:
-                    self.log(f"Failed to get RAG info for job {job_id}")
+                # Update the database with the page's RAG info in one batch and release its claims
+                with self.timer.stage('db_write'):
+                    self._release_claimed(jobs, lambda: bulk_update(self.db.conn, ['rag_info'], updates))
+                if updates:
+                    self.log(f"Updated RAG info for {len(updates)} jobs")
+                processed += len(updates)
             
-            return processed_count
+            if not claimed:
+                self.log("No jobs found with keywords but without RAG info")
+                return 0
+            
+            self.log(f"RAG stage timings: {self.timer.summary()}")
+            self.log(f"RAG retrieval timings: {self.rag.timings.summary()}")
+            if self.rag.embedding_cache:
+                self.log(f"Embedding cache: {self.rag.embedding_cache.stats()}")
+            if self.rag.result_cache:
+                self.log(f"Result cache: {self.rag.result_cache.stats()}")
+            
+            return processed
         
         except Exception as e:
             self.log(f"Error processing job RAG info: {str(e)}")
-            return 0
+            return processed
     
     def analyze_job_fitness(self):
         """Analyze fitness of jobs against RAG info."""
+        if self.analysis_mode == 'batch':
+            return self.analyze_job_fitness_batch()
+        
+        processed = 0
+        claimed = 0
         try:
-            # Get jobs with RAG info but not analyzed
-            with self.db.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, job_id, title, description, rag_info
-                    FROM jobs 
-                    WHERE rag_info IS NOT NULL AND gpt_analysis IS NULL
-                    LIMIT 25
-                """)
-                jobs = cur.fetchall()
-            
-            if not jobs:
-                self.log("No jobs found with RAG info but without analysis")
-                return 0
-            
-            processed_count = 0
-            
-            for job in jobs:
-                job_id = job[1]
-                title = job[2]
-                description = job[3]
-                rag_info = job[4]
-                
-                self.log(f"Analyzing fitness for job: {title} (ID: {job_id})")
+            # Claim jobs with RAG info but not analyzed page by page
+            for jobs in self._claim_pages('needs_analysis', page_size=25):
+                claimed += len(jobs)
+                updates = []
                 
-                # Create a job data dictionary for the analyzer
-                job_data = {
-                    'id': job_id,
-                    'title': title,
-                    'description': description,
-                    'rag_info': rag_info
-                }
-                
-                # Analyze job fitness
-                analysis = self.analyze_with_gpt(job_data)
-                
-                if analysis:
-                    is_best_fit = analysis['is_best_fit']
-                    analysis_text = analysis['analysis']
-                    score = analysis.get('score', None)
+                for job in jobs:
+                    job_id = job['job_id']
+                    self.log(f"Analyzing fitness for job: {job['title']} (ID: {job_id})")
                     
-                    # Update the database with the analysis
-                    with self.db.conn.cursor() as cur:
-                        cur.execute("""
-                            UPDATE jobs
-                            SET gpt_analysis = %s, is_best_fit = %s, score = %s
-                            WHERE job_id = %s
-                        """, (analysis_text, is_best_fit, score, job_id))
-                        self.db.conn.commit()
+                    # Create a job data dictionary for the analyzer
+                    job_data = {
+                        'id': job_id,
+                        'title': job['title'],
+                        'description': job['description'],
+                        'rag_info': job['rag_info']
+                    }
                     
-                    processed_count += 1
-                    self.log(f"Updated analysis for job {job_id} (Best fit: {is_best_fit}, Score: {score})")
+                    # Analyze job fitness
+                    analysis = self.analyze_with_gpt(job_data)
                     
-                    # Don't overload the system
-                    time.sleep(1)
-                else:
-                    self.log(f"Failed to analyze job {job_id}")
+                    if analysis:
+                        is_best_fit = analysis['is_best_fit']
+                        score = analysis.get('score', None)
+                        updates.append((job_id, analysis['analysis'], is_best_fit, score))
+                        self.log(f"Analyzed job {job_id} (Best fit: {is_best_fit}, Score: {score})")
+                    else:
+                        self.log(f"Failed to analyze job {job_id}")
+                
+                # Write the page's analyses in a single batched UPDATE and release its claims
+                self._release_claimed(jobs, lambda: self._write_analyses(updates, commit=False))
+                if updates:
+                    self.log(f"Updated analysis for {len(updates)} jobs")
+                processed += len(updates)
             
-            return processed_count
+            if not claimed:
+                self.log("No jobs found with RAG info but without analysis")
+            return processed
         
         except Exception as e:
             self.log(f"Error analyzing job fitness: {str(e)}")
-            return 0
+            return processed
     
-    def analyze_with_gpt(self, job_data):
-        """Analyze job fitness using GPT."""
+    def analyze_job_fitness_batch(self):
+        """Analyze fitness of all pending jobs through the OpenAI Batch API.
+        
+        Results of batches submitted by earlier runs are applied first; jobs that are
+        still part of a running batch are not resubmitted. Jobs are claimed through the
+        work queue for the batch completion window, so concurrent workers never submit
+        the same job twice; the claims are released when the batch results are applied.
+        """
         try:
-            prompt = f"""
-            Analyze this job opportunity against my experience and knowledge to determine if it's a good fit.
-            
-            Job Details:
-            Title: {job_data['title']}
-            
-            Job Description:
-            {job_data['description'][:4000]}
-            
-            My Relevant Experience and Skills (from Personal Knowledge Database):
-            {job_data['rag_info']}
-            
-            Please provide a detailed analysis including:
-            1. A score from 1-10 with 1 digit after the decimal point indicating how good of a fit this job is (format as "Score: X/10")
-            2. Key strengths where my experience and skills match the job requirements
-            3. Gaps where I lack experience or skills required for the job
-            4. Overall assessment of fit and specific recommendations
+            runner = BatchAnalysisRunner(
+                self.batch_client,
+                work_dir=os.getenv('BATCH_WORK_DIR', 'batches'),
+                max_wait=float(os.getenv('BATCH_MAX_WAIT', 3600))
+            )
+            processed_count = 0
             
-            Note: The information about my experience is provided as raw document chunks. Extract and use only the relevant information from these chunks when evaluating the fit.
-            """
+            # Collect batches left running by previous runs
+            for entry in runner.pending_batches():
+                batch = runner.client.retrieve(entry['batch_id'])
+                if batch['status'] in FINAL_STATUSES:
+                    processed_count += self._apply_batch_results(runner, batch)
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",  # Using the larger model for detailed analysis
-                messages=[
-                    {"role": "system", "content": "You are a career advisor helping to match job opportunities with a candidate's experience and skills. Provide honest and practical analysis of fit."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
+            # Claim jobs with RAG info but no analysis that are not already in a batch
+            limit = int(os.getenv('BATCH_ANALYSIS_LIMIT', 1000))
+            in_flight = runner.pending_custom_ids()
+            requests = []
+            submitted = []
+            skipped = []
+            for jobs in self._claim_pages('needs_analysis', page_size=min(limit, 250),
+                                          lease_seconds=int(os.getenv('BATCH_LEASE_SECONDS', 86400))):
+                for job in jobs:
+                    if str(job['job_id']) in in_flight or len(requests) >= limit:
+                        skipped.append(job)
+                        continue
+                    job_data = {'id': job['job_id'], 'title': job['title'],
+                                'description': job['description'], 'rag_info': job['rag_info']}
+                    requests.append((job['job_id'], self._build_analysis_request(job_data)))
+                    submitted.append(job)
+                if len(requests) >= limit:
+                    break
+            self._release_claimed(skipped)
             
-            analysis = response.choices[0].message.content
+            if not requests:
+                self.log("No new jobs to submit for batch analysis")
+                return processed_count
             
-            # Extract score to determine if it's a best fit
-            is_best_fit = False
-            score = 0
+            try:
+                batch_id = runner.submit(requests, claimed_by=self.worker_id)
+            except Exception:
+                self._release_claimed(submitted)
+                raise
+            self.log(f"Submitted {len(requests)} jobs for batch analysis (batch {batch_id})")
             
-            # Various score extraction patterns
-            patterns = [
-                r'score[:\s]+(\d+(?:\.\d+)?)\s*\/?\s*10',
-                r'(\d+(?:\.\d+)?)\s*\/\s*10',
-                r'rating[:\s]+(\d+(?:\.\d+)?)\s*\/?\s*10'
-            ]
+            batch = runner.wait(batch_id)
+            if batch is None:
+                self.log(f"Batch {batch_id} is still running; results will be applied on the next run")
+            else:
+                processed_count += self._apply_batch_results(runner, batch)
             
-            import re
-            for pattern in patterns:
-                match = re.search(pattern, analysis.lower())
-                if match:
-                    try:
-                        score = float(match.group(1))
-                        is_best_fit = score >= 7.0
-                        break
-                    except (ValueError, IndexError):
-                        pass
-            
-            return {
-                'is_best_fit': is_best_fit,
-                'analysis': analysis,
-                'score': score
-            }
+            return processed_count
+        
+        except Exception as e:
+            self.log(f"Error in batch job fitness analysis: {str(e)}")
+            return 0
+    
+    def _apply_batch_results(self, runner, batch):
+        """Write the analyses of a finished batch to the database in one UPDATE.
+        
+        The claims on the batch's jobs are released in the same transaction, so jobs whose
+        request failed can be claimed again. The batch is dropped from the runner's pending
+        state only after the UPDATE is committed, so if the write fails its results are
+        collected again next run.
+        """
+        results = runner.collect(batch)
+        entry = next((entry for entry in runner.pending_batches() if entry['batch_id'] == batch['id']), {})
+        job_ids = set(entry.get('custom_ids', [])) | set(results)
+        self.log(f"Batch {batch['id']} finished with status {batch['status']} ({len(results)} results)")
+        
+        updates = []
+        for job_id, analysis_text in results.items():
+            if not analysis_text:
+                self.log(f"Failed to analyze job {job_id} in batch {batch['id']}")
+                continue
+            analysis = self._parse_analysis(analysis_text)
+            updates.append((job_id, analysis['analysis'], analysis['is_best_fit'], analysis['score']))
+        
+        # Batches submitted before claims were recorded have no claimed_by; releasing is then a no-op
+        self._release_claimed([{'job_id': job_id} for job_id in job_ids],
+                              lambda: self._write_analyses(updates, commit=False),
+                              worker_id=entry.get('claimed_by'))
+        if updates:
+            self.log(f"Updated analysis for {len(updates)} jobs from batch {batch['id']}")
+        runner.forget(batch['id'])
+        
+        return len(updates)
+    
+    def _write_analyses(self, updates, commit=True):
+        """Write (job_id, gpt_analysis, is_best_fit, score) rows with one batched UPDATE."""
+        bulk_update(self.db.conn, ['gpt_analysis', 'is_best_fit', 'score'], updates,
+                    types={'is_best_fit': 'boolean', 'score': 'numeric'})
+        if commit:
+            self.db.conn.commit()
+    
+    def _build_analysis_request(self, job_data):
+        """Build the chat completion request body for a job fitness analysis."""
+        return {
+            "model": self.prompt_builder.model,  # Using the larger model for detailed analysis
+            "messages": self.prompt_builder.build_messages(job_data),
+            "temperature": 0.7,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _parse_analysis(self, analysis):
+        """Turn an analysis response into stored text, score and best-fit flag."""
+        return parse_analysis_response(analysis)
+    
+    def analyze_with_gpt(self, job_data):
+        """Analyze job fitness using GPT."""
+        try:
+            response = self._chat_completion(**self._build_analysis_request(job_data))
+            return self._parse_analysis(response.choices[0].message.content)
         except Exception as e:
             self.log(f"Error analyzing with GPT: {str(e)}")
             return None
     
     def process_job_scores(self):
-        """Process jobs with analysis but without scores yet."""
+        """Backfill scores for analyses stored without one, entirely in SQL.
+        
+        New analyses get their score when they are written; this only covers older
+        rows, using the same labelled-score pattern as the Python fallback parser.
+        """
         try:
-            # Get jobs with analysis but no score
             with self.db.conn.cursor() as cur:
                 cur.execute("""
-                    SELECT id, job_id, gpt_analysis
-                    FROM jobs 
-                    WHERE gpt_analysis IS NOT NULL AND score IS NULL
-                    LIMIT 50
-                """)
-                jobs = cur.fetchall()
-            
-            if not jobs:
-                self.log("No jobs found with analysis but without scores")
-                return 0
-            
-            processed_count = 0
-            
-            for job in jobs:
-                job_id = job[1]
-                analysis = job[2]
-                
-                # Extract score from analysis
-                score = 0
-                patterns = [
-                    r'score[:\s]+(\d+(?:\.\d+)?)\s*\/?\s*10',
-                    r'(\d+(?:\.\d+)?)\s*\/\s*10',
-                    r'rating[:\s]+(\d+(?:\.\d+)?)\s*\/?\s*10'
-                ]
-                
-                import re
-                for pattern in patterns:
-                    match = re.search(pattern, analysis.lower())
-                    if match:
-                        try:
-                            score = float(match.group(1))
-                            break
-                        except (ValueError, IndexError):
-                            pass
-                
-                if score > 0:
-                    # Update the database with the score
-                    with self.db.conn.cursor() as cur:
-                        cur.execute("""
-                            UPDATE jobs
-                            SET score = %s, is_best_fit = %s
-                            WHERE job_id = %s
-                        """, (score, score >= 7.0, job_id))
-                        self.db.conn.commit()
-                    
-                    processed_count += 1
-                    self.log(f"Updated score for job {job_id} (Score: {score})")
+                    UPDATE jobs
+                    SET score = data.score, is_best_fit = data.score >= %s
+                    FROM (
+                        SELECT job_id, substring(gpt_analysis from %s)::numeric AS score
+                        FROM jobs
+                        WHERE pipeline_state = 'needs_score'
+                    ) AS data
+                    WHERE jobs.job_id = data.job_id
+                      AND data.score IS NOT NULL AND data.score <= 10
+                """, (BEST_FIT_THRESHOLD, SCORE_PATTERN))
+                processed_count = cur.rowcount
+            self.db.conn.commit()
             
+            if processed_count:
+                self.log(f"Backfilled scores for {processed_count} jobs")
+            else:
+                self.log("No jobs found with analysis but without scores")
             return processed_count
         
         except Exception as e:
+            self.db.conn.rollback()
             self.log(f"Error processing job scores: {str(e)}")
             return 0
 
@@ -599,14 +1016,6 @@ def main():
     """Main entry point for the job processing workflow."""
     print(f"Starting job processing at {datetime.now()}")
     
-    # Run database schema update first
-    try:
-        from update_database import update_database_schema
-        update_database_schema()
-    except Exception as e:
-        print(f"Error updating database schema: {str(e)}")
-        print("Continuing with processing...")
-    
     # Initialize job processor
     processor = JobProcessor()
     
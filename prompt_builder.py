@@ -0,0 +1,145 @@
+import os
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
+
+# Static instructions, sent first so the provider can cache this prefix across the whole batch
+FITNESS_SYSTEM_PROMPT = """You are a career advisor helping to match job opportunities with a candidate's experience and skills. Provide honest and practical analysis of fit. Always answer with a single JSON object.
+
+For every job you receive, analyze the opportunity against the candidate's experience and knowledge to determine if it's a good fit.
+
+Respond with a JSON object containing exactly these fields:
+- "score": a number from 1-10 with 1 digit after the decimal point indicating how good of a fit this job is
+- "strengths": a list of key strengths where the candidate's experience and skills match the job requirements
+- "gaps": a list of gaps where the candidate lacks experience or skills required for the job
+- "recommendation": an overall assessment of fit and specific recommendations
+
+Note: The candidate's relevant experience is provided as raw document chunks from a personal knowledge database. Extract and use only the relevant information from these chunks when evaluating the fit."""
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model):
+    """Return a tiktoken encoding for the model, or None if tiktoken or its encoding files are unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken not installed, falling back to approximate token counts")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads encodings on first use, which fails offline or behind a proxy
+        logger.warning(f"Could not load tiktoken encoding for {model}, falling back to approximate token counts: {str(e)}")
+        return None
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Count the tokens of a text for the given model (about 4 characters per token without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4o"):
+    """Cut a text down to at most max_tokens tokens, keeping its beginning."""
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+class FitnessPromptBuilder:
+    """Builds job fitness prompts that fit a token budget.
+
+    The static system prompt and candidate profile come first and are identical for
+    every job, so provider-side prompt caching applies across the batch. The variable
+    job description and RAG context follow and are trimmed to the remaining budget.
+    """
+
+    def __init__(self, model="gpt-4o", token_budget=6000, description_share=0.5, candidate_profile=None):
+        """
+        Args:
+            model: Model name, used to select the tokenizer
+            token_budget: Maximum input tokens for the whole prompt
+            description_share: Fraction of the variable budget reserved for the job description
+                (unused space is handed to the RAG context and vice versa)
+            candidate_profile: Optional static text describing the candidate, included in the cached prefix
+        """
+        self.model = model
+        self.token_budget = token_budget
+        self.description_share = description_share
+
+        system_prompt = FITNESS_SYSTEM_PROMPT
+        if candidate_profile:
+            system_prompt += f"\n\nCandidate Profile:\n{candidate_profile.strip()}"
+        self.system_prompt = system_prompt
+        self.system_tokens = count_tokens(system_prompt, model)
+
+    @classmethod
+    def from_env(cls, model="gpt-4o"):
+        """Create a builder configured from PROMPT_TOKEN_BUDGET, PROMPT_DESCRIPTION_SHARE and CANDIDATE_PROFILE_PATH."""
+        profile = None
+        profile_path = os.getenv('CANDIDATE_PROFILE_PATH')
+        if profile_path and os.path.exists(profile_path):
+            with open(profile_path, 'r', encoding='utf-8') as f:
+                profile = f.read()
+        return cls(
+            model=model,
+            token_budget=int(os.getenv('PROMPT_TOKEN_BUDGET', 6000)),
+            description_share=float(os.getenv('PROMPT_DESCRIPTION_SHARE', 0.5)),
+            candidate_profile=profile
+        )
+
+    def build_messages(self, job_data):
+        """
+        Build the chat messages for one job.
+
+        Args:
+            job_data (dict): Job with 'title', 'description' and 'rag_info'
+
+        Returns:
+            list: Chat messages (static system prompt first, job-specific content last)
+        """
+        header = f"Job Title: {job_data['title']}\n\nJob Description:\n"
+        rag_header = "\n\nMy Relevant Experience and Skills (from Personal Knowledge Database):\n"
+
+        # Reserve a few tokens per message for the chat format overhead
+        available = self.token_budget - self.system_tokens - count_tokens(header + rag_header, self.model) - 16
+        description = job_data.get('description') or ""
+        rag_info = job_data.get('rag_info') or ""
+        description_budget, rag_budget = self._split_budget(
+            max(0, available),
+            count_tokens(description, self.model),
+            count_tokens(rag_info, self.model)
+        )
+
+        user_content = (header + truncate_to_tokens(description, description_budget, self.model)
+                        + rag_header + truncate_to_tokens(rag_info, rag_budget, self.model))
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+    def _split_budget(self, available, description_tokens, rag_tokens):
+        """Split the variable budget between description and RAG context, giving unused room to the other."""
+        description_budget = int(available * self.description_share)
+        rag_budget = available - description_budget
+        if description_tokens < description_budget:
+            rag_budget += description_budget - description_tokens
+            description_budget = description_tokens
+        elif rag_tokens < rag_budget:
+            description_budget += rag_budget - rag_tokens
+            rag_budget = rag_tokens
+        return description_budget, rag_budget
@@ -0,0 +1,244 @@
+import os
+import copy
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text):
+    """Normalize query text so trivially different spellings share a cache entry."""
+    return " ".join(str(text).lower().split())
+
+
+class EmbeddingCache:
+    """Content-addressed cache for query embeddings.
+
+    Entries are keyed by the normalized query text and the embedding model ID.
+    Recently used entries are kept in an in-memory LRU; all entries are also
+    persisted to a SQLite file so they survive between scheduled runs.
+    """
+
+    def __init__(self, path, model_id, max_memory_entries=2048, max_disk_entries=100000):
+        """
+        Args:
+            path: SQLite file for the on-disk store (None keeps the cache in memory only)
+            model_id: Identifier of the embedding model, part of every cache key
+            max_memory_entries: Maximum number of embeddings kept in the in-memory LRU
+            max_disk_entries: Maximum number of embeddings kept on disk (least recently used are evicted)
+        """
+        self.path = path
+        self.model_id = model_id
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_entries = 0
+        self.conn = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model_id TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+            self.conn.commit()
+            self.disk_entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def key(self, text):
+        """Return the cache key for a query text."""
+        return hashlib.sha256(f"{self.model_id}\0{normalize_query(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, text):
+        """Return the cached embedding for a query, or None on a miss."""
+        key = self.key(text)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return self.memory[key]
+
+            if self.conn is not None:
+                row = self.conn.execute("SELECT dim, vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self.conn.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self.conn.commit()
+                    embedding = np.frombuffer(row[1], dtype=np.float32).reshape(row[0])
+                    self._remember(key, embedding)
+                    self.disk_hits += 1
+                    return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, text, embedding):
+        """Store the embedding for a query in memory and on disk."""
+        key = self.key(text)
+        embedding = np.asarray(embedding, dtype=np.float32)
+        with self.lock:
+            self._remember(key, embedding)
+            if self.conn is not None:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO embeddings (key, model_id, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, self.model_id, embedding.shape[0], embedding.tobytes(), time.time())
+                )
+                if cursor.rowcount:
+                    self.disk_entries += 1
+                else:
+                    self.conn.execute("UPDATE embeddings SET vector = ?, last_used = ? WHERE key = ?",
+                                      (embedding.tobytes(), time.time(), key))
+                self._evict_disk()
+                self.conn.commit()
+
+    def _remember(self, key, embedding):
+        self.memory[key] = embedding
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict_disk(self):
+        overflow = self.disk_entries - self.max_disk_entries
+        if overflow > 0:
+            self.conn.execute("""
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+                )
+            """, (overflow,))
+            self.disk_entries -= overflow
+            self.evictions += overflow
+
+    def stats(self):
+        """Return hit/miss counters and the overall hit rate."""
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'memory_entries': len(self.memory),
+                'disk_entries': self.disk_entries,
+                'hit_rate': hits / lookups if lookups else 0.0
+            }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class ResultCache:
+    """TTL- and size-bounded cache for RAG retrieval results.
+
+    Entries are invalidated as a whole whenever the collection version reported
+    by version_fn changes (e.g. the entity count or an explicit version marker).
+    """
+
+    def __init__(self, version_fn=None, max_entries=512, ttl_seconds=3600, version_check_interval=30):
+        """
+        Args:
+            version_fn: Callable returning the current collection version (any hashable value)
+            max_entries: Maximum number of cached results (least recently used are evicted)
+            ttl_seconds: Maximum age of a cached result in seconds
+            version_check_interval: Minimum seconds between two version_fn calls
+        """
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_interval = version_check_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(query, method, k, return_full_docs):
+        """Return the cache key for a retrieval request."""
+        return (normalize_query(query), str(method), int(k), bool(return_full_docs))
+
+    def _check_version(self):
+        """Clear the cache if the collection version changed (called without holding the lock).
+
+        version_fn may be a remote call (e.g. the Milvus entity count), so it runs outside
+        the lock; the lock is only taken to claim the check and to compare and clear.
+        """
+        if self.version_fn is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if now - self.version_checked_at < self.version_check_interval:
+                return
+            # Claim this check so concurrent callers keep using the cache in the meantime
+            self.version_checked_at = now
+        try:
+            version = self.version_fn()
+        except Exception as e:
+            logger.warning(f"Could not determine collection version, clearing result cache: {str(e)}")
+            version = None
+        with self.lock:
+            if version != self.version or version is None:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+
+    def get(self, key):
+        """Return a cached result, or None if missing, expired or invalidated."""
+        self._check_version()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, value):
+        """Store a result under the given key."""
+        self._check_version()
+        with self.lock:
+            self.entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the overall hit rate."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -13,6 +13,7 @@ Usage:
     python run_job_processing.py --no-rag        # Run without RAG functionality
     python run_job_processing.py --no-milvus     # Run without Milvus connection check
     python run_job_processing.py --test          # Run in test mode (no Apify scraping)
+    python run_job_processing.py --drain --workers 4  # Drain the job backlog with 4 worker processes
 
 Before running, make sure all dependencies are installed:
     pip install -r requirements.txt
@@ -22,6 +23,7 @@ import os
 import sys
 import argparse
 import subprocess
+import multiprocessing
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -158,7 +160,7 @@ def run_processing(use_rag=True, test_mode=False, skip_milvus=False):
             print("\nRunning in TEST MODE - will skip Apify scraping")
         
         # Initialize the job processor
-        processor = JobProcessor(test_mode=test_mode)
+        processor = JobProcessor(test_mode=test_mode, use_rag=use_rag)
         
         # Check if RAG is available and required
         if use_rag and processor.rag is None:
@@ -187,6 +189,76 @@ def run_processing(use_rag=True, test_mode=False, skip_milvus=False):
         traceback.print_exc()
         sys.exit(1)
 
+def run_drain_worker(use_rag=True):
+    """Entry point of one backlog worker process."""
+    from process_jobs_rag import JobProcessor
+    processor = JobProcessor(test_mode=True, use_rag=use_rag)
+    if use_rag and processor.rag is None:
+        # Without RAG the worker would only drain the keyword stage; fail the run instead
+        processor.db.close()
+        raise RuntimeError("RAG is enabled but PersonalRAG could not be initialized in the worker")
+    processor.drain_backlog()
+
+def run_drain(workers=1, use_rag=True, skip_milvus=False):
+    """
+    Drain the job backlog with several worker processes (no Apify scraping).
+    Workers claim jobs through the database work queue, so more workers can be
+    started the same way on other hosts.
+    
+    Args:
+        workers (int): Number of worker processes
+        use_rag (bool): Whether to use RAG functionality
+        skip_milvus (bool): Skip Milvus connection check
+    """
+    print(f"\n{'=' * 60}")
+    print(f"Draining job backlog with {workers} workers at {datetime.now()}")
+    print(f"{'=' * 60}")
+    
+    if not check_env_vars():
+        sys.exit(1)
+    
+    if use_rag and not skip_milvus:
+        if not check_and_start_docker():
+            print("\nWarning: Could not verify Docker containers are running.")
+        # Workers have no terminal to ask whether to continue without Milvus, so check once here
+        from process_jobs_rag import milvus_reachable
+        if not milvus_reachable():
+            print("\nError: Cannot connect to Milvus, which the RAG stage needs.")
+            print("Start Milvus, or run with --no-rag (skip RAG) or --no-milvus (skip this check).")
+            sys.exit(1)
+    # The workers (spawned with this environment) must not check Milvus again
+    os.environ['SKIP_MILVUS_CHECK'] = 'true'
+
+    # Migrate once up front so the workers don't all race to create the migrations table
+    try:
+        from db_pool import get_pool
+        from migrate import apply_migrations
+        with get_pool().connection() as conn:
+            applied = apply_migrations(conn, log=print)
+        get_pool().closeall()
+        if applied:
+            print(f"Applied {len(applied)} schema migrations")
+    except Exception as e:
+        print(f"Error applying schema migrations: {str(e)}")
+
+    # Each worker loads its own models and database connection
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_drain_worker, args=(use_rag,), name=f"drain-worker-{i}")
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    failed = [process.name for process in processes if process.exitcode != 0]
+    if failed:
+        print(f"\nWorkers failed: {', '.join(failed)}")
+        sys.exit(1)
+    
+    print(f"\n{'=' * 60}")
+    print(f"Backlog drained at {datetime.now()}")
+    print(f"{'=' * 60}\n")
+
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(
@@ -198,11 +270,14 @@ Examples:
   python run_job_processing.py --no-rag        # Run without RAG functionality
   python run_job_processing.py --no-milvus     # Run without Milvus check
   python run_job_processing.py --test          # Run in test mode (no scraping)
+  python run_job_processing.py --drain --workers 4  # Drain the backlog with 4 processes
         """
     )
     parser.add_argument('--no-rag', action='store_true', help='Run without RAG functionality')
     parser.add_argument('--no-milvus', action='store_true', help='Skip Milvus connection check')
     parser.add_argument('--test', action='store_true', help='Run in test mode (no Apify scraping)')
+    parser.add_argument('--drain', action='store_true', help='Only drain the job backlog (no Apify scraping)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for --drain')
     args = parser.parse_args()
     
     # Print banner
@@ -211,4 +286,7 @@ Examples:
     print("╚══════════════════════════════════════════════════════╝")
     
     # Run the processing
-    run_processing(use_rag=not args.no_rag, test_mode=args.test, skip_milvus=args.no_milvus) 
\ No newline at end of file
+    if args.drain:
+        run_drain(workers=max(1, args.workers), use_rag=not args.no_rag, skip_milvus=args.no_milvus)
+    else:
+        run_processing(use_rag=not args.no_rag, test_mode=args.test, skip_milvus=args.no_milvus) 
\ No newline at end of file
@@ -0,0 +1,154 @@
+import random
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_after_seconds(error):
+    """Return the server-suggested retry delay carried by an API error, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        value = headers.get('retry-after')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_backoff(func, *args, retry_on=(Exception,), max_retries=5,
+                      base_delay=1.0, max_delay=60.0, **kwargs):
+    """Call a function, retrying with exponential backoff and jitter.
+
+    Args:
+        func: Callable to invoke
+        retry_on: Tuple of exception types that trigger a retry
+        max_retries: Maximum number of retries after the first attempt
+        base_delay: Delay in seconds before the first retry
+        max_delay: Upper bound for a single delay in seconds (also caps Retry-After)
+
+    Returns:
+        Whatever func returns
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except retry_on as e:
+            if attempt >= max_retries:
+                raise
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = min(max_delay, base_delay * (2 ** attempt))
+                delay = delay * (0.5 + random.random() / 2)
+            else:
+                # Don't let a large Retry-After stall the worker beyond max_delay
+                delay = min(max(0.0, delay), max_delay)
+            logger.warning(f"{type(e).__name__} on attempt {attempt + 1}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class TokenBucket:
+    """Thread-safe token bucket for limiting the rate of outgoing calls."""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: Tokens added per second (0 or None disables limiting)
+            capacity: Maximum burst size, defaults to max(1, rate)
+        """
+        self.rate = rate or 0
+        self.capacity = capacity or max(1.0, float(self.rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class StageTimer:
+    """Accumulates wall-clock timings per named stage, safe to share between threads."""
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block and record it under the given stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            stat = self.stats.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            stat['count'] += 1
+            stat['total'] += seconds
+            stat['max'] = max(stat['max'], seconds)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def summary(self):
+        """Return a one-line human-readable summary of all recorded stages."""
+        with self.lock:
+            parts = []
+            for name, stat in self.stats.items():
+                avg = stat['total'] / stat['count'] if stat['count'] else 0.0
+                parts.append(f"{name}: n={stat['count']} total={stat['total']:.2f}s "
+                             f"avg={avg:.3f}s max={stat['max']:.3f}s")
+            return "; ".join(parts) if parts else "no stages recorded"
+
+
+def map_concurrently(func, items, max_workers=4, rate_limiter=None):
+    """Apply func to every item on a bounded thread pool.
+
+    Args:
+        func: Callable taking a single item
+        items: Items to process
+        max_workers: Maximum number of concurrent calls
+        rate_limiter: Optional TokenBucket acquired before each call
+
+    Returns:
+        List of (item, result, error) tuples in input order; error is None on success
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return func(item)
+
+    results = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = {executor.submit(run, item): index for index, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = (items[index], future.result(), None)
+            except Exception as e:
+                results[index] = (items[index], None, e)
+    return results
@@ -0,0 +1,124 @@
+import os
+import json
+import logging
+import threading
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Relative date filters accepted by the LinkedIn jobs actor, smallest window first
+DATE_FILTER_WINDOWS = [(1, "r86400"), (7, "r604800"), (30, "r2592000")]
+
+_file_lock = threading.Lock()
+
+
+def _published_date(item):
+    """Return the YYYY-MM-DD publish date of an Apify job item, or None."""
+    value = item.get('publishedAt')
+    return str(value)[:10] if value else None
+
+
+class ScrapeWatermark:
+    """Per-task high-water mark for incremental scraping.
+
+    Remembers the latest published_at seen for an Apify task and the job IDs seen
+    within the lookback window before it. Items older than the window or already
+    seen are dropped before any mapping or database work.
+    """
+
+    def __init__(self, task_id, path="cache/scrape_watermarks.json", lookback_days=2, date_filter_field=None):
+        """
+        Args:
+            task_id: Apify task the watermark belongs to
+            path: JSON file holding the watermarks of all tasks
+            lookback_days: Days before the watermark still checked by job ID, for postings indexed late
+            date_filter_field: Actor input field taking a relative date filter (e.g. 'publishedAt'),
+                               or None if the actor does not support one
+        """
+        self.task_id = task_id
+        self.path = path
+        self.lookback_days = lookback_days
+        self.date_filter_field = date_filter_field
+        self.last_published_at = None
+        self.seen = {}
+        self.skipped = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f).get(self.task_id, {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read scrape watermark: {str(e)}")
+            return
+        self.last_published_at = state.get("last_published_at")
+        self.seen = state.get("seen_job_ids", {})
+
+    @property
+    def cutoff(self):
+        """Oldest publish date that can still hold unseen jobs."""
+        if not self.last_published_at:
+            return None
+        return (date.fromisoformat(self.last_published_at) - timedelta(days=self.lookback_days)).isoformat()
+
+    def is_new(self, item):
+        """Return True if an Apify item has not been ingested for this task yet."""
+        if str(item.get('id')) in self.seen:
+            return False
+        published = _published_date(item)
+        cutoff = self.cutoff
+        return not (published and cutoff and published < cutoff)
+
+    def filter_new(self, items):
+        """Drop items that are already known, counting them in self.skipped."""
+        new_items = [item for item in items if isinstance(item, dict) and self.is_new(item)]
+        self.skipped += len(items) - len(new_items)
+        return new_items
+
+    def record(self, items):
+        """Advance the watermark with items that have been stored."""
+        today = date.today().isoformat()
+        for item in items:
+            if not item.get('id'):
+                continue
+            published = _published_date(item) or today
+            self.seen[str(item['id'])] = published
+            if not self.last_published_at or published > self.last_published_at:
+                self.last_published_at = published
+
+        # Job IDs older than the cutoff are rejected by date alone, so they need not be kept
+        cutoff = self.cutoff
+        if cutoff:
+            self.seen = {job_id: published for job_id, published in self.seen.items() if published >= cutoff}
+
+    def save(self):
+        """Write the watermark back, keeping the entries of other tasks."""
+        with _file_lock:
+            state = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+            state[self.task_id] = {
+                "last_published_at": self.last_published_at,
+                "seen_job_ids": self.seen
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+
+    def actor_input(self):
+        """Return actor input overrides restricting the scrape to the window since the watermark."""
+        if not self.date_filter_field or not self.cutoff:
+            return None
+        days = (date.today() - date.fromisoformat(self.cutoff)).days
+        for window_days, value in DATE_FILTER_WINDOWS:
+            if days <= window_days:
+                return {self.date_filter_field: value}
+        return None
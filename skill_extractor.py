@@ -0,0 +1,368 @@
+import os
+import re
+import json
+import math
+import logging
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+# Tokens keep the characters that matter in skill names (c++, c#, .net, node.js) but drop sentence dots
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+# Canonical skill name -> aliases. Aliases that are common English words on their own
+# ("rest", "spring", "cv") are only listed in unambiguous forms.
+DEFAULT_SKILLS = {
+    # Programming languages
+    "Python": ["python3", "py"],
+    "Java": ["java8", "java 8", "java 11", "java 17"],
+    "JavaScript": ["js", "javascript es6", "es6", "ecmascript"],
+    "TypeScript": ["ts"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["c sharp", "csharp"],
+    "C": ["c programming", "c language", "ansi c", "embedded c"],
+    "Go": ["golang", "go lang", "go programming"],
+    "Rust": ["rustlang"],
+    "Kotlin": [],
+    "Swift": ["swiftui", "swift programming", "swift 5"],
+    "Scala": [],
+    "R": ["r programming", "r language", "rstudio", "r studio", "tidyverse"],
+    "MATLAB": ["simulink"],
+    "PHP": ["laravel", "symfony"],
+    "Ruby": ["ruby on rails", "rails"],
+    "SQL": ["t-sql", "tsql", "pl/sql", "plsql", "sql queries"],
+    "Bash": ["shell scripting", "bash scripting", "shell scripts"],
+    "Julia": ["julia language"],
+    "SAS": ["sas programming"],
+    "VBA": ["excel vba"],
+    # Web and backend frameworks
+    "React": ["react.js", "reactjs", "react native", "react hooks", "react components",
+              "react typescript", "react developer", "react frontend"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "nuxt"],
+    "Node.js": ["nodejs", "express.js", "expressjs"],
+    "Django": ["django rest framework", "drf"],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["spring framework", "springboot", "spring mvc"],
+    ".NET": ["dotnet", "asp.net", ".net core", "net core"],
+    "GraphQL": [],
+    "REST APIs": ["restful", "rest api", "restful api", "restful apis", "rest services"],
+    "gRPC": [],
+    "Microservices": ["microservice", "microservice architecture"],
+    # Data engineering
+    "Apache Spark": ["pyspark", "spark sql", "apache spark", "spark streaming"],
+    "Hadoop": ["hdfs", "mapreduce", "hive"],
+    "Apache Kafka": ["kafka", "kafka streams"],
+    "Apache Airflow": ["airflow"],
+    "dbt": ["data build tool"],
+    "Apache Flink": ["flink"],
+    "ETL": ["elt", "etl pipelines", "data pipelines", "data pipeline"],
+    "Databricks": [],
+    "Snowflake": [],
+    "BigQuery": ["big query", "google bigquery"],
+    "Amazon Redshift": ["redshift"],
+    "Data Warehousing": ["data warehouse", "data warehouses", "dwh"],
+    "Data Modeling": ["data modelling", "dimensional modeling", "dimensional modelling"],
+    # Databases
+    "PostgreSQL": ["postgres", "postgresql database"],
+    "MySQL": ["mariadb"],
+    "SQL Server": ["microsoft sql server", "ms sql", "mssql"],
+    "Oracle Database": ["oracle db", "oracle database", "oracle sql"],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "elk", "opensearch"],
+    "Cassandra": ["apache cassandra"],
+    "DynamoDB": ["dynamo db"],
+    "Neo4j": ["graph database", "graph databases"],
+    "NoSQL": ["no sql"],
+    "Vector Databases": ["vector database", "vector db", "milvus", "pinecone", "weaviate", "qdrant", "pgvector"],
+    # Cloud and DevOps
+    "AWS": ["amazon web services", "ec2", "s3", "aws lambda", "lambda functions", "sagemaker", "aws sagemaker"],
+    "Azure": ["microsoft azure", "azure devops", "azure ml", "azure machine learning"],
+    "GCP": ["google cloud", "google cloud platform", "vertex ai"],
+    "Docker": ["containerization", "dockerfile", "docker compose"],
+    "Kubernetes": ["k8s", "helm chart", "helm charts", "openshift", "eks", "aks", "gke"],
+    "Terraform": ["infrastructure as code", "iac"],
+    "Ansible": [],
+    "CI/CD": ["continuous integration", "continuous delivery", "continuous deployment", "github actions",
+              "gitlab ci", "jenkins", "circleci"],
+    "Git": ["github", "gitlab", "bitbucket", "version control"],
+    "Linux": ["unix", "ubuntu", "red hat", "rhel"],
+    "Prometheus": ["grafana"],
+    "Serverless": [],
+    # Machine learning and AI
+    "Machine Learning": ["ml", "machine learning models", "ml models"],
+    "Deep Learning": ["neural networks", "neural network"],
+    "Natural Language Processing": ["nlp", "natural language understanding", "nlu", "text mining"],
+    "Computer Vision": ["image processing", "object detection", "image recognition"],
+    "Large Language Models": ["llm", "llms", "large language model", "generative ai", "genai", "gen ai",
+                              "foundation models", "gpt", "chatgpt"],
+    "Retrieval-Augmented Generation": ["rag", "retrieval augmented generation"],
+    "Prompt Engineering": [],
+    "LangChain": ["llamaindex", "llama index"],
+    "Hugging Face": ["huggingface", "transformers"],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["keras"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "XGBoost": ["lightgbm", "catboost", "gradient boosting"],
+    "Pandas": [],
+    "NumPy": ["scipy"],
+    "MLOps": ["ml ops", "mlflow", "kubeflow", "model deployment", "model serving"],
+    "Reinforcement Learning": [],
+    "Recommender Systems": ["recommendation systems", "recommender system", "recommendation engine"],
+    "Time Series Analysis": ["time series", "time series forecasting"],
+    "Statistics": ["statistical modeling", "statistical modelling", "statistical analysis",
+                   "hypothesis testing", "bayesian statistics"],
+    "A/B Testing": ["ab testing", "a b testing"],
+    "Data Analysis": ["data analytics", "exploratory data analysis", "eda"],
+    "Data Science": [],
+    "Data Visualization": ["data visualisation", "matplotlib", "seaborn", "plotly", "d3.js"],
+    # BI and analytics tools
+    "Tableau": [],
+    "Power BI": ["powerbi", "power query", "dax"],
+    "Looker": ["looker studio"],
+    "Microsoft Excel": ["ms excel", "advanced excel", "excel spreadsheets"],
+    # Frontend
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss", "tailwind", "tailwind css"],
+    "Next.js": ["nextjs"],
+    "Redux": [],
+    # Mobile
+    "Android": ["android sdk"],
+    "iOS": ["ios development"],
+    "Flutter": ["dart"],
+    # Testing and quality
+    "Unit Testing": ["unit tests", "pytest", "junit", "jest", "test driven development", "tdd"],
+    "Test Automation": ["selenium", "cypress", "playwright", "automated testing"],
+    # Security and networking
+    "Cybersecurity": ["cyber security", "information security", "infosec", "security engineering"],
+    "OAuth": ["oauth2", "openid connect", "oidc", "sso", "single sign on"],
+    "Networking": ["tcp ip", "tcp/ip", "dns", "network protocols"],
+    # Architecture and practices
+    "System Design": ["software architecture", "distributed systems", "scalable systems"],
+    "Object-Oriented Programming": ["oop", "object oriented programming", "object oriented design",
+                                    "design patterns"],
+    "Agile": ["scrum", "kanban", "agile methodologies", "agile methodology"],
+    "Jira": ["confluence"],
+    "Embedded Systems": ["embedded software", "firmware", "rtos", "microcontrollers"],
+    "Blockchain": ["smart contracts", "solidity", "web3"],
+    # Business and product
+    "Product Management": ["product owner", "product roadmap"],
+    "Project Management": ["pmp", "prince2"],
+    "SAP": ["sap s/4hana", "s/4hana", "sap hana"],
+    "Salesforce": ["salesforce crm"],
+    "SEO": ["search engine optimization", "search engine optimisation"],
+}
+
+# Everyday words that are never matched on their own, whether they appear as a canonical
+# name or as an alias (also in custom taxonomies); those skills match through longer aliases
+AMBIGUOUS_TERMS = frozenset({"c", "r", "go", "swift", "julia", "ruby", "react", "spark", "helm"})
+
+
+def tokenize(text):
+    """Lowercase text and split it into skill-matching tokens (keeps c++, c#, .net, node.js intact)."""
+    text = re.sub(r"<[^>]+>", " ", str(text or "").lower())
+    return TOKEN_PATTERN.findall(text)
+
+
+def load_taxonomy(path=None):
+    """
+    Return the skill taxonomy, extended or overridden by a JSON file.
+
+    Args:
+        path: Optional JSON file mapping canonical skill names to lists of aliases
+
+    Returns:
+        dict: Canonical skill name -> list of aliases
+    """
+    taxonomy = {skill: list(aliases) for skill, aliases in DEFAULT_SKILLS.items()}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            taxonomy.update(json.load(f))
+    return taxonomy
+
+
+class SkillAutomaton:
+    """Aho-Corasick automaton over word tokens.
+
+    Patterns are token sequences, so every match starts and ends on a token boundary,
+    and one pass over a description finds all occurrences of all aliases at once.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns: Mapping of token tuples to the value reported when they match
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for tokens, value in patterns.items():
+            self._add(tokens, value)
+        self._build_failure_links()
+
+    def _add(self, tokens, value):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(tokens), value))
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for token, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(token, 0)
+                # Inherit the matches of the longest proper suffix
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find_all(self, tokens):
+        """
+        Find all pattern occurrences in a token list.
+
+        Returns:
+            list: (start, end, value) tuples, end exclusive, possibly overlapping
+        """
+        matches = []
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, value in self._out[state]:
+                matches.append((index - length + 1, index + 1, value))
+        return matches
+
+
+class SkillExtractor:
+    """Deterministic, offline keyword extraction against a curated skill taxonomy.
+
+    Skills are matched in the normalized title and description with an Aho-Corasick
+    automaton (leftmost-longest, so "SQL Server" does not also count as "SQL"). They
+    are ranked by sublinear term frequency (title matches weigh more) and, once
+    fit() has seen a corpus of job postings, by inverse document frequency, so skills
+    every posting mentions rank below the distinctive ones.
+    """
+
+    def __init__(self, taxonomy=None, max_keywords=7, min_skills=3, title_weight=2.0):
+        """
+        Args:
+            taxonomy: Mapping of canonical skill names to aliases (defaults to DEFAULT_SKILLS)
+            max_keywords: Maximum number of skills returned per job
+            min_skills: Minimum number of distinct skills for a job to count as covered
+            title_weight: Weight of a match in the job title relative to one in the description
+        """
+        self.taxonomy = taxonomy or load_taxonomy()
+        self.max_keywords = max_keywords
+        self.min_skills = min_skills
+        self.title_weight = title_weight
+        self._idf = {}
+        self._default_idf = 1.0
+        self.corpus_size = 0
+
+        patterns = {}
+        for skill, aliases in self.taxonomy.items():
+            for alias in [skill] + list(aliases):
+                tokens = tuple(tokenize(alias))
+                if tokens and not (len(tokens) == 1 and tokens[0] in AMBIGUOUS_TERMS):
+                    patterns.setdefault(tokens, skill)
+        self.automaton = SkillAutomaton(patterns)
+
+    @classmethod
+    def from_env(cls):
+        """Create an extractor configured from SKILL_TAXONOMY_PATH, KEYWORD_MAX_SKILLS and KEYWORD_MIN_SKILLS."""
+        return cls(
+            taxonomy=load_taxonomy(os.getenv('SKILL_TAXONOMY_PATH') or None),
+            max_keywords=int(os.getenv('KEYWORD_MAX_SKILLS', 7)),
+            min_skills=int(os.getenv('KEYWORD_MIN_SKILLS', 3))
+        )
+
+    def match(self, text):
+        """
+        Find the skills mentioned in a text.
+
+        Returns:
+            list: (position, skill) tuples in text order, without overlapping matches
+        """
+        matches = sorted(self.automaton.find_all(tokenize(text)), key=lambda m: (m[0], m[0] - m[1]))
+        found = []
+        covered_until = 0
+        for start, end, skill in matches:
+            if start >= covered_until:
+                found.append((start, skill))
+                covered_until = end
+        return found
+
+    def fit(self, documents):
+        """
+        Learn skill document frequencies from a corpus of job postings for TF-IDF ranking.
+
+        Args:
+            documents: Iterable of posting texts (e.g. title and description)
+
+        Returns:
+            SkillExtractor: self
+        """
+        document_frequency = Counter()
+        count = 0
+        for document in documents:
+            document_frequency.update({skill for _, skill in self.match(document)})
+            count += 1
+        # Smoothed IDF; swapped in as a whole so concurrent rank() calls see a consistent table
+        self._idf = {skill: math.log((1 + count) / (1 + df)) + 1 for skill, df in document_frequency.items()}
+        self._default_idf = math.log(1 + count) + 1
+        self.corpus_size = count
+        return self
+
+    def rank(self, title, description):
+        """
+        Rank the skills of a job posting.
+
+        Returns:
+            list: (skill, score) tuples, best first
+        """
+        weights = Counter()
+        first_seen = {}
+        for text, weight, offset in ((title, self.title_weight, 0), (description, 1.0, 1 << 20)):
+            for position, skill in self.match(text):
+                weights[skill] += weight
+                first_seen.setdefault(skill, offset + position)
+
+        idf = self._idf
+        scored = [(skill, (1 + math.log(weight)) * idf.get(skill, self._default_idf))
+                  for skill, weight in weights.items()]
+        scored.sort(key=lambda item: (-item[1], first_seen[item[0]]))
+        return scored
+
+    def extract(self, title, description):
+        """Return the top skills of a job posting."""
+        return [skill for skill, _ in self.rank(title, description)[:self.max_keywords]]
+
+    def keywords(self, title, description, min_skills=None):
+        """
+        Extract keywords in the comma-separated format stored in jobs.keyword.
+
+        Args:
+            title: Job title
+            description: Job description
+            min_skills: Minimum number of distinct skills (defaults to self.min_skills)
+
+        Returns:
+            str: Comma-separated skills, or None if fewer than min_skills were found
+        """
+        skills = self.extract(title, description)
+        if not skills or len(skills) < (self.min_skills if min_skills is None else min_skills):
+            return None
+        return ", ".join(skills)
@@ -0,0 +1,176 @@
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a StagedPipeline.
+
+    With batch_size 1, func takes an item and returns the item to pass on. With a
+    larger batch_size, func takes a list of up to batch_size items and returns the
+    list to pass on; a worker waits at most max_batch_wait seconds to fill a batch.
+    Returning None drops the item(s). If func raises, the error is logged and the
+    items are passed on unchanged, so later stages decide what to do with them.
+    """
+
+    def __init__(self, name, func, workers=1, batch_size=1, max_batch_wait=0.2):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_batch_wait = max_batch_wait
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def summary(self):
+        return (f"{self.name}: {self.items} items, {self.busy_seconds:.1f}s busy, "
+                f"{self.blocked_seconds:.1f}s blocked downstream, {self.errors} errors")
+
+
+class StagedPipeline:
+    """Runs items through stages connected by bounded queues.
+
+    Every stage has its own worker threads, and items move on as soon as a stage
+    emits them, so the stages overlap and total time approaches that of the slowest
+    stage. A full queue blocks the stage feeding it (backpressure), which bounds the
+    number of items in flight.
+    """
+
+    def __init__(self, stages, queue_size=16, log=None):
+        """
+        Args:
+            stages: List of Stage objects, in order
+            queue_size: Capacity of the queue in front of each stage
+            log: Logging function (defaults to the module logger)
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.log = log or logger.info
+        self.elapsed = None
+
+    def run(self, items):
+        """
+        Feed items through all stages.
+
+        Args:
+            items: Iterable of items; consumed lazily as the first queue has room
+
+        Returns:
+            list: Items emitted by the last stage (in completion order)
+
+        Raises:
+            Exception: Whatever iterating items raises, after the items already fed have
+                       gone through all stages
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        results_lock = threading.Lock()
+        threads = []
+        start = time.monotonic()
+
+        for index, stage in enumerate(self.stages):
+            in_queue = queues[index]
+            out_queue = queues[index + 1] if index + 1 < len(self.stages) else None
+            remaining = [stage.workers]
+
+            def emit(item, stage=stage, out_queue=out_queue):
+                if out_queue is None:
+                    with results_lock:
+                        results.append(item)
+                    return
+                waited = time.monotonic()
+                out_queue.put(item)
+                with stage._lock:
+                    stage.blocked_seconds += time.monotonic() - waited
+
+            def finish(stage=stage, out_queue=out_queue, remaining=remaining):
+                # The last worker of a stage to finish closes the next queue
+                with stage._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and out_queue is not None:
+                    out_queue.put(_DONE)
+
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, in_queue, emit, finish),
+                    name=f"{stage.name}-{worker}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            # Even if items raises, let the workers finish the items in flight and exit
+            queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.monotonic() - start
+        return results
+
+    def _worker(self, stage, in_queue, emit, finish):
+        try:
+            while True:
+                batch, done = self._take(stage, in_queue)
+                if batch:
+                    self._process(stage, batch, emit)
+                if done:
+                    return
+        finally:
+            finish()
+
+    def _take(self, stage, in_queue):
+        """Take up to batch_size items; returns (items, done) where done means the input is exhausted."""
+        item = in_queue.get()
+        if item is _DONE:
+            in_queue.put(_DONE)  # let the stage's other workers see it too
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + stage.max_batch_wait
+        while len(batch) < stage.batch_size:
+            try:
+                item = in_queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                in_queue.put(_DONE)
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _process(self, stage, batch, emit):
+        started = time.monotonic()
+        try:
+            if stage.batch_size == 1:
+                output = stage.func(batch[0])
+                output = [] if output is None else [output]
+            else:
+                output = stage.func(batch) or []
+        except Exception as e:
+            with stage._lock:
+                stage.errors += 1
+            self.log(f"Error in pipeline stage {stage.name}: {str(e)}")
+            output = batch
+        with stage._lock:
+            stage.items += len(batch)
+            stage.busy_seconds += time.monotonic() - started
+        for item in output:
+            emit(item)
+
+    def summary(self):
+        """Return a one-line summary of every stage and the total time."""
+        stages = "; ".join(stage.summary() for stage in self.stages)
+        total = f"{self.elapsed:.1f}s" if self.elapsed is not None else "not run"
+        return f"total {total} | {stages}"
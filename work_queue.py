@@ -0,0 +1,87 @@
+import os
+import socket
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_COLUMNS = ('id', 'job_id', 'title', 'description', 'keyword', 'rag_info')
+
+
+def default_worker_id():
+    """Identify this worker process across hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobWorkQueue:
+    """Database-backed work queue over the jobs table.
+
+    Workers claim pending jobs in id order with FOR UPDATE SKIP LOCKED, so
+    concurrent workers (in any process or on any host) never claim the same job.
+    A claim is a lease: claimed_until is set in the database clock, and jobs whose
+    lease expired (e.g. their worker crashed) can be claimed again. Each worker
+    walks the backlog with keyset pagination on id, so one pass visits every
+    pending job once even if some of them cannot be completed.
+    """
+
+    def __init__(self, conn, pending_condition, worker_id=None, lease_seconds=900):
+        """
+        Args:
+            conn: psycopg2 connection used only by the queue (claims are committed immediately)
+            pending_condition: SQL condition selecting jobs that still need work
+            worker_id: Identifier stored in claimed_by (defaults to host:pid)
+            lease_seconds: Seconds a claim stays valid
+        """
+        self.conn = conn
+        self.pending_condition = pending_condition
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.claimed = 0
+
+    def claim(self, limit, after_id=0):
+        """
+        Claim up to limit pending jobs with an id greater than after_id.
+
+        Returns:
+            list: Claimed jobs as dictionaries, ordered by id
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE jobs
+                SET claimed_by = %s, claimed_until = now() + make_interval(secs => %s)
+                WHERE id IN (
+                    SELECT id
+                    FROM jobs
+                    WHERE ({self.pending_condition})
+                      AND id > %s
+                      AND (claimed_until IS NULL OR claimed_until < now())
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING {", ".join(JOB_QUEUE_COLUMNS)}
+            """, (self.worker_id, self.lease_seconds, after_id, limit))
+            rows = cur.fetchall()
+        self.conn.commit()
+        self.claimed += len(rows)
+        return sorted((dict(zip(JOB_QUEUE_COLUMNS, row)) for row in rows), key=lambda job: job['id'])
+
+    def iter_claims(self, batch_size=25):
+        """Yield claimed jobs one at a time, claiming the next page only when the previous one is consumed."""
+        after_id = 0
+        while True:
+            jobs = self.claim(batch_size, after_id)
+            if not jobs:
+                return
+            yield from jobs
+            after_id = jobs[-1]['id']
+
+    @staticmethod
+    def release(cur, job_ids, worker_id):
+        """Release the claims of a worker on the given jobs (runs in the caller's transaction)."""
+        if not job_ids:
+            return
+        cur.execute("""
+            UPDATE jobs
+            SET claimed_by = NULL, claimed_until = NULL
+            WHERE job_id = ANY(%s) AND claimed_by = %s
+        """, (list(job_ids), worker_id))